@@ -14,15 +14,21 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import bisect
 import collections
+import concurrent.futures
 import datetime
+import functools
 import glob
+import itertools
 import json
 import logging
 import math
+import operator
 import os
 import pickle
 import random
+import re
 import socket
 import statistics
 import sys
@@ -31,13 +37,21 @@ import uuid
 import zlib
 from enum import Enum, IntEnum
 
+import elasticsearch.helpers
 import tabulate
 import urllib3.connection
-from elastic_transport import Urllib3HttpNode
+import zstandard
+from elastic_transport import ApiError, TransportError, Urllib3HttpNode
 
 from esrally import client, config, exceptions, paths, time, types, version
 from esrally.utils import console, convert, io, pretty, versions
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional and only speeds up writing race files
+    orjson = None  # type: ignore[assignment]
+
 
 class EsClient:
     """
@@ -48,13 +62,30 @@ class EsClient:
     # event loop (see guarded()) well under Thespian's 5-minute message delivery timeout.
     FLUSH_REQUEST_TIMEOUT = 60
 
-    def __init__(self, client, cluster_version=None):
+    # Exponential backoff (in seconds) between retries in guarded(), indexed by the number of preceding attempts.
+    RETRY_BACKOFF = tuple(2**i for i in range(11))
+
+    def __init__(
+        self,
+        client,
+        cluster_version=None,
+        bulk_thread_count=4,
+        bulk_queue_size=4,
+        bulk_chunk_size=5000,
+        bulk_max_chunk_bytes=10 * 1024 * 1024,
+    ):
         self._client = client
         # Reused across the flush/close path.
         self._flush_client = client.options(request_timeout=self.FLUSH_REQUEST_TIMEOUT)
         self.logger = logging.getLogger(__name__)
         self._cluster_version = cluster_version
-        self.retryable_status_codes = [502, 503, 504, 429]
+        self._bulk_thread_count = bulk_thread_count
+        self._bulk_queue_size = bulk_queue_size
+        self._bulk_chunk_size = bulk_chunk_size
+        self._bulk_max_chunk_bytes = bulk_max_chunk_bytes
+        self.retryable_status_codes = frozenset([502, 503, 504, 429])
+        # requests may be retried from several threads so avoid contention on the global random number generator
+        self._random = random.Random()
 
     def get_template(self, name):
         return self.guarded(self._client.indices.get_index_template, name=name)
@@ -111,153 +142,215 @@ class EsClient:
         return self.guarded(self._flush_client.indices.refresh, index=index)
 
     def bulk_index(self, *, index, items, use_data_streams):
-        # pylint: disable=import-outside-toplevel
-        import elasticsearch.helpers
-
-        if use_data_streams:
-            for item in items:
-                item["_op_type"] = "create"
-        self.guarded(elasticsearch.helpers.bulk, self._flush_client, items, index=index, chunk_size=5000)
+        action = {"create": {}} if use_data_streams else {"index": {}}
+        self._bulk_index(index, items, action)
 
     def index(self, *, index, item, id=None, use_data_streams):
-        doc = {"_source": item}
-        if not use_data_streams and id:
-            doc["_id"] = id
-        self.bulk_index(index=index, items=[doc], use_data_streams=use_data_streams)
+        if use_data_streams:
+            # data streams only accept create operations and assign ids themselves
+            self.guarded(self._flush_client.index, index=index, document=item, op_type="create")
+        else:
+            self.guarded(self._flush_client.index, index=index, document=item, id=id)
+
+    def _bulk_index(self, index, items, action):
+        # Documents that need to be sent (again). When a request is retried, we only send the documents that have not been
+        # indexed yet. Data streams assign ids themselves, so resending documents that have been indexed already would duplicate them.
+        pending = items
+
+        def bulk(client, **kwargs):
+            nonlocal pending
+            docs = iter(pending)
+            # parallel_bulk() reports results in the order of the documents so we can match them with the documents that have been sent.
+            unacknowledged = collections.deque()
+
+            def track(source):
+                for doc in source:
+                    unacknowledged.append(doc)
+                    yield doc
+
+            failed_docs = []
+            errors = []
+            try:
+                for ok, info in elasticsearch.helpers.parallel_bulk(
+                    client, track(docs), raise_on_error=False, raise_on_exception=False, **kwargs
+                ):
+                    doc = unacknowledged.popleft()
+                    if not ok:
+                        failed_docs.append(doc)
+                        errors.append(info)
+            except TransportError:
+                # The client does not attribute connection-level errors to a specific chunk. Other chunks may have been in flight at
+                # the same time and might have been indexed already, so they may be duplicated when the request is retried.
+                pending = itertools.chain(failed_docs, unacknowledged, docs)
+                raise
+            pending = failed_docs
+            if errors:
+                raise elasticsearch.helpers.BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+        # Our documents never contain bulk metadata, so they can all share the same action line. This avoids that the client's
+        # default action expansion copies and inspects every single document.
+        def expand_action(item):
+            return action, item
+
+        self.guarded(
+            bulk,
+            self._flush_client,
+            index=index,
+            expand_action_callback=expand_action,
+            chunk_size=self._bulk_chunk_size,
+            max_chunk_bytes=self._bulk_max_chunk_bytes,
+            thread_count=self._bulk_thread_count,
+            queue_size=self._bulk_queue_size,
+        )
 
     def search(self, index, body):
         return self.guarded(self._client.search, index=index, body=body)
 
-    def guarded(self, target, *args, _max_retries=3, **kwargs):
-        # pylint: disable=import-outside-toplevel
-        import elasticsearch
-        import elasticsearch.helpers
-        from elastic_transport import ApiError, TransportError
+    def open_point_in_time(self, index, keep_alive):
+        return self.guarded(self._client.open_point_in_time, index=index, keep_alive=keep_alive)["id"]
+
+    def close_point_in_time(self, pit_id):
+        # ignore 404 status code (NotFoundError) when the point in time has already expired
+        return self.guarded(self._client.close_point_in_time, id=pit_id, ignore=404)
 
+    def guarded(self, target, *args, _max_retries=3, **kwargs):
         # 3 retries × 60s request_timeout + sleep keeps worst-case blocking under
         # Thespian's 5-minute actor event-loop delivery timeout.
         max_execution_count = _max_retries
         execution_count = 0
 
-        while execution_count <= max_execution_count:
-            time_to_sleep = 2**execution_count + random.random()
+        while True:
+            time_to_sleep = self.RETRY_BACKOFF[min(execution_count, len(self.RETRY_BACKOFF) - 1)] + self._random.random()
             execution_count += 1
 
             try:
                 return target(*args, **kwargs)
-            except elasticsearch.exceptions.ConnectionTimeout as e:
-                if execution_count <= max_execution_count:
-                    self.logger.debug(
-                        "Connection timeout [%s] in attempt [%d/%d]. Sleeping for [%f] seconds.",
-                        e.message,
-                        execution_count,
-                        max_execution_count,
-                        time_to_sleep,
-                    )
-                    time.sleep(time_to_sleep)
-                else:
-                    operation = target.__name__
-                    self.logger.exception("Connection timeout while running [%s] (retried %d times).", operation, max_execution_count)
-                    node = self._client.transport.node_pool.get()
-                    msg = (
-                        "A connection timeout occurred while running the operation [%s] against your Elasticsearch metrics store on "
-                        "host [%s] at port [%s]." % (operation, node.host, node.port)
-                    )
-                    raise exceptions.RallyError(msg)
-            except elasticsearch.exceptions.ConnectionError as e:
-                if execution_count <= max_execution_count:
-                    self.logger.debug(
-                        "Connection error [%s] in attempt [%d/%d]. Sleeping for [%f] seconds.",
-                        e.message,
-                        execution_count,
-                        max_execution_count,
-                        time_to_sleep,
-                    )
-                    time.sleep(time_to_sleep)
-                else:
-                    node = self._client.transport.node_pool.get()
-                    msg = (
-                        "Could not connect to your Elasticsearch metrics store. Please check that it is running on host [%s] at port [%s]"
-                        " or fix the configuration in [%s]." % (node.host, node.port, config.ConfigFile().location)
-                    )
-                    self.logger.exception(msg)
-                    # connection errors doesn't neccessarily mean it's during setup
-                    raise exceptions.RallyError(msg)
-            except elasticsearch.exceptions.AuthenticationException:
-                # we know that it is just one host (see EsClientFactory)
-                node = self._client.transport.node_pool.get()
-                msg = (
-                    "The configured user could not authenticate against your Elasticsearch metrics store running on host [%s] at "
-                    "port [%s] (wrong password?). Please fix the configuration in [%s]."
-                    % (node.host, node.port, config.ConfigFile().location)
-                )
-                self.logger.exception(msg)
-                raise exceptions.SystemSetupError(msg)
-            except elasticsearch.exceptions.AuthorizationException:
-                node = self._client.transport.node_pool.get()
-                msg = (
-                    "The configured user does not have enough privileges to run the operation [%s] against your Elasticsearch metrics "
-                    "store running on host [%s] at port [%s]. Please adjust your x-pack configuration or specify a user with enough "
-                    "privileges in the configuration in [%s]." % (target.__name__, node.host, node.port, config.ConfigFile().location)
-                )
-                self.logger.exception(msg)
-                raise exceptions.SystemSetupError(msg)
-            except elasticsearch.helpers.BulkIndexError as e:
-                for err in e.errors:
-                    op = err.get("create") or err.get("index") or {}
-                    err_type = op.get("error", {}).get("type", None)
-                    if op.get("status", None) not in self.retryable_status_codes:
-                        msg = f"Unretryable error encountered when sending metrics to remote metrics store: [{err_type}]"
-                        self.logger.exception("%s - Full error(s) [%s]", msg, str(e.errors))
-                        raise exceptions.RallyError(msg)
-
-                if execution_count <= max_execution_count:
-                    self.logger.debug(
-                        "Error in sending metrics to remote metrics store [%s] in attempt [%d/%d]. Sleeping for [%f] seconds.",
-                        e,
-                        execution_count,
-                        max_execution_count,
-                        time_to_sleep,
-                    )
-                    time.sleep(time_to_sleep)
-                else:
-                    msg = f"Failed to send metrics to remote metrics store: [{e.errors}]"
-                    self.logger.exception("%s - Full error(s) [%s]", msg, str(e.errors))
-                    raise exceptions.RallyError(msg)
-            except ApiError as e:
-                if e.status_code in self.retryable_status_codes and execution_count <= max_execution_count:
-                    self.logger.debug(
-                        "%s (code: %d) in attempt [%d/%d]. Sleeping for [%f] seconds.",
-                        e.error,
-                        e.status_code,
-                        execution_count,
-                        max_execution_count,
-                        time_to_sleep,
-                    )
-                    time.sleep(time_to_sleep)
-                else:
-                    node = self._client.transport.node_pool.get()
-                    msg = (
-                        "An error [%s] occurred while running the operation [%s] against your Elasticsearch metrics store on host [%s] "
-                        "at port [%s]. args: [%s], kwargs: [%s]" % (e.error, target.__name__, node.host, node.port, args, kwargs)
-                    )
-                    self.logger.exception(msg)
-                    # this does not necessarily mean it's a system setup problem...
-                    raise exceptions.RallyError(msg)
-            except TransportError as e:
-                node = self._client.transport.node_pool.get()
-
-                if e.errors:
-                    err = e.errors
-                else:
-                    err = e
-                msg = (
-                    "Transport error(s) [%s] occurred while running the operation [%s] against your Elasticsearch metrics store on "
-                    "host [%s] at port [%s]. args: [%s], kwargs: [%s]" % (err, target.__name__, node.host, node.port, args, kwargs)
+            except (elasticsearch.helpers.BulkIndexError, ApiError, TransportError) as e:
+                # scan the failed items of a bulk request only once
+                unretryable_item = self._unretryable_bulk_item(e) if isinstance(e, elasticsearch.helpers.BulkIndexError) else None
+                retry_reason = self._retry_reason(e, unretryable_item)
+                if retry_reason is None or execution_count > max_execution_count:
+                    raise self._to_rally_error(e, unretryable_item, target, args, kwargs, max_execution_count)
+                reason_format, reason_args = retry_reason
+                self.logger.debug(
+                    reason_format + " in attempt [%d/%d]. Sleeping for [%f] seconds.",
+                    *reason_args,
+                    execution_count,
+                    max_execution_count,
+                    time_to_sleep,
                 )
-                self.logger.exception(msg)
-                # this does not necessarily mean it's a system setup problem...
-                raise exceptions.RallyError(msg)
+                time.sleep(time_to_sleep)
+
+    def _retry_reason(self, e, unretryable_item):
+        """
+        Determines whether a request that has failed with the provided error should be retried.
+
+        :param e: The error that has occurred.
+        :param unretryable_item: The first failed bulk item that must not be retried if ``e`` is a ``BulkIndexError``, ``None`` otherwise.
+        :return: A tuple of a log message format and its arguments that describes the error if the request should be retried,
+                 ``None`` otherwise.
+        """
+        if isinstance(e, elasticsearch.exceptions.ConnectionTimeout):
+            return "Connection timeout [%s]", (e.message,)
+        if isinstance(e, elasticsearch.exceptions.ConnectionError):
+            return "Connection error [%s]", (e.message,)
+        if isinstance(e, elasticsearch.helpers.BulkIndexError):
+            if unretryable_item is not None:
+                return None
+            return "Error in sending metrics to remote metrics store [%s]", (e,)
+        if isinstance(e, (elasticsearch.exceptions.AuthenticationException, elasticsearch.exceptions.AuthorizationException)):
+            return None
+        if isinstance(e, ApiError) and e.status_code in self.retryable_status_codes:
+            return "%s (code: %d)", (e.error, e.status_code)
+        return None
+
+    def _unretryable_bulk_item(self, e):
+        """
+        :param e: A ``BulkIndexError``.
+        :return: The first failed bulk item that must not be retried or ``None`` if all failed items can be retried.
+        """
+        for err in e.errors:
+            item = err.get("create") or err.get("index") or {}
+            if item.get("status") not in self.retryable_status_codes:
+                return item
+        return None
+
+    def _to_rally_error(self, e, unretryable_item, target, args, kwargs, max_execution_count):
+        """
+        Translates an error that is not retried (anymore) to the error that should be raised instead.
+
+        :param e: The error that has occurred.
+        :param unretryable_item: The first failed bulk item that must not be retried if ``e`` is a ``BulkIndexError``, ``None`` otherwise.
+        :param target: The operation that has failed.
+        :param args: Positional arguments of the failed operation.
+        :param kwargs: Keyword arguments of the failed operation.
+        :param max_execution_count: The maximum number of retries.
+        :return: The corresponding ``RallyError``.
+        """
+        if isinstance(e, elasticsearch.exceptions.ConnectionTimeout):
+            operation = target.__name__
+            self.logger.exception("Connection timeout while running [%s] (retried %d times).", operation, max_execution_count)
+            node = self._client.transport.node_pool.get()
+            msg = (
+                "A connection timeout occurred while running the operation [%s] against your Elasticsearch metrics store on "
+                "host [%s] at port [%s]." % (operation, node.host, node.port)
+            )
+            return exceptions.RallyError(msg)
+        if isinstance(e, elasticsearch.exceptions.ConnectionError):
+            node = self._client.transport.node_pool.get()
+            msg = (
+                "Could not connect to your Elasticsearch metrics store. Please check that it is running on host [%s] at port [%s]"
+                " or fix the configuration in [%s]." % (node.host, node.port, config.ConfigFile().location)
+            )
+            self.logger.exception(msg)
+            # connection errors doesn't neccessarily mean it's during setup
+            return exceptions.RallyError(msg)
+        if isinstance(e, elasticsearch.exceptions.AuthenticationException):
+            # we know that it is just one host (see EsClientFactory)
+            node = self._client.transport.node_pool.get()
+            msg = (
+                "The configured user could not authenticate against your Elasticsearch metrics store running on host [%s] at "
+                "port [%s] (wrong password?). Please fix the configuration in [%s]." % (node.host, node.port, config.ConfigFile().location)
+            )
+            self.logger.exception(msg)
+            return exceptions.SystemSetupError(msg)
+        if isinstance(e, elasticsearch.exceptions.AuthorizationException):
+            node = self._client.transport.node_pool.get()
+            msg = (
+                "The configured user does not have enough privileges to run the operation [%s] against your Elasticsearch metrics "
+                "store running on host [%s] at port [%s]. Please adjust your x-pack configuration or specify a user with enough "
+                "privileges in the configuration in [%s]." % (target.__name__, node.host, node.port, config.ConfigFile().location)
+            )
+            self.logger.exception(msg)
+            return exceptions.SystemSetupError(msg)
+        if isinstance(e, elasticsearch.helpers.BulkIndexError):
+            if unretryable_item is not None:
+                err_type = unretryable_item.get("error", {}).get("type", None)
+                msg = f"Unretryable error encountered when sending metrics to remote metrics store: [{err_type}]"
+                self.logger.exception("%s - Full error(s) [%s]", msg, str(e.errors))
+                return exceptions.RallyError(msg)
+            msg = f"Failed to send metrics to remote metrics store: [{e.errors}]"
+            self.logger.exception("%s - Full error(s) [%s]", msg, str(e.errors))
+            return exceptions.RallyError(msg)
+        if isinstance(e, ApiError):
+            node = self._client.transport.node_pool.get()
+            msg = (
+                "An error [%s] occurred while running the operation [%s] against your Elasticsearch metrics store on host [%s] "
+                "at port [%s]. args: [%s], kwargs: [%s]" % (e.error, target.__name__, node.host, node.port, args, kwargs)
+            )
+            self.logger.exception(msg)
+            # this does not necessarily mean it's a system setup problem...
+            return exceptions.RallyError(msg)
+
+        node = self._client.transport.node_pool.get()
+        err = e.errors if e.errors else e
+        msg = (
+            "Transport error(s) [%s] occurred while running the operation [%s] against your Elasticsearch metrics store on "
+            "host [%s] at port [%s]. args: [%s], kwargs: [%s]" % (err, target.__name__, node.host, node.port, args, kwargs)
+        )
+        self.logger.exception(msg)
+        # this does not necessarily mean it's a system setup problem...
+        return exceptions.RallyError(msg)
 
 
 DATASTORE_API_KEY: str = os.environ.get("RALLY_REPORTING_DATASTORE_API_KEY", "")
@@ -296,6 +389,19 @@ class KeepaliveUrllib3HttpNode(Urllib3HttpNode):
         self.pool.conn_kw["socket_options"] = self.pool.conn_kw["socket_options"] + _KEEPALIVE_SOCKET_OPTIONS
 
 
+def _json_serializer():
+    """
+    :return: An orjson-based serializer for the metrics store client if the optional ``orjson`` package is installed,
+             ``None`` otherwise (i.e. the client falls back to its default stdlib-based serializer).
+    """
+    # pylint: disable=import-outside-toplevel
+    from elasticsearch import serializer
+
+    # the Elasticsearch client only defines this serializer if orjson can be imported
+    orjson_serializer = getattr(serializer, "OrjsonSerializer", None)
+    return orjson_serializer() if orjson_serializer else None
+
+
 class EsClientFactory:
     """
     Abstracts how the Elasticsearch client is created. Intended for testing.
@@ -327,6 +433,13 @@ class EsClientFactory:
 
         verify = self._config.opts("reporting", "datastore.ssl.verification_mode", default_value="full", mandatory=False) != "none"
         ca_path = self._config.opts("reporting", "datastore.ssl.certificate_authorities", default_value=None, mandatory=False)
+        self._bulk_thread_count = int(self._config.opts("reporting", "datastore.bulk.thread_count", default_value=4, mandatory=False))
+        self._bulk_queue_size = int(self._config.opts("reporting", "datastore.bulk.queue_size", default_value=4, mandatory=False))
+        self._bulk_chunk_size = int(self._config.opts("reporting", "datastore.bulk.chunk_size", default_value=5000, mandatory=False))
+        self._bulk_max_chunk_bytes = int(
+            self._config.opts("reporting", "datastore.bulk.max_chunk_bytes", default_value=10 * 1024 * 1024, mandatory=False)
+        )
+        http_compress = convert.to_bool(self._config.opts("reporting", "datastore.http_compress", default_value=False, mandatory=False))
         self.probe_version = self._config.opts("reporting", "datastore.probe.cluster_version", default_value=True, mandatory=False)
 
         # Instead of duplicating code, we're just adapting the metrics store specific properties to match the regular client options.
@@ -334,7 +447,7 @@ class EsClientFactory:
         client_options = {
             "use_ssl": secure,
             "verify_certs": verify,
-            "timeout": 120,
+            "request_timeout": 120,
         }
         if ca_path:
             client_options["ca_certs"] = ca_path
@@ -353,6 +466,14 @@ class EsClientFactory:
 
         # Use keepalive nodes for the long-lived metrics connection only (not the probe above).
         client_options["node_class"] = KeepaliveUrllib3HttpNode
+        # parallel bulk requests must not compete for connections with each other (the client's default is 10 per node)
+        client_options["connections_per_node"] = max(10, self._bulk_thread_count)
+        if http_compress:
+            client_options["http_compress"] = True
+        # Encoding metrics documents is the dominant CPU cost of bulk indexing so use a faster serializer if available.
+        json_serializer = _json_serializer()
+        if json_serializer:
+            client_options["serializer"] = json_serializer
 
         factory = client_factory(
             hosts=hosts,
@@ -363,7 +484,13 @@ class EsClientFactory:
         self._client = factory.create()
 
     def create(self):
-        c = EsClient(self._client)
+        c = EsClient(
+            self._client,
+            bulk_thread_count=self._bulk_thread_count,
+            bulk_queue_size=self._bulk_queue_size,
+            bulk_chunk_size=self._bulk_chunk_size,
+            bulk_max_chunk_bytes=self._bulk_max_chunk_bytes,
+        )
         return c
 
 
@@ -394,6 +521,20 @@ class EsStoreType(Enum):
         return obj
 
 
+@functools.cache
+def _read_resource(script_dir, resource_name):
+    """
+    Reads a JSON resource (e.g. an index template) that is shipped with Rally. These files don't change while Rally is running, so they
+    are only read once.
+
+    :param script_dir: Rally's root directory.
+    :param resource_name: The name of the resource without file extension.
+    :return: The contents of the resource as a string.
+    """
+    with open(os.path.join(script_dir, "resources", f"{resource_name}.json"), encoding="utf-8") as f:
+        return f.read()
+
+
 class IndexTemplateProvider:
     """
     Abstracts how the Rally index template is retrieved. Intended for testing.
@@ -412,18 +553,17 @@ class IndexTemplateProvider:
         return json.dumps(self._read("annotation-template"))
 
     def _read(self, template_name):
-        with open("%s/resources/%s.json" % (self.script_dir, template_name), encoding="utf-8") as f:
-            template = json.load(f)
-            if self._number_of_shards is not None:
-                if int(self._number_of_shards) < 1:
-                    raise exceptions.SystemSetupError(
-                        f"The setting: datastore.number_of_shards must be >= 1. Please "
-                        f"check the configuration in {self._config.config_file.location}"
-                    )
-                template["template"]["settings"]["index"]["number_of_shards"] = int(self._number_of_shards)
-            if self._number_of_replicas is not None:
-                template["template"]["settings"]["index"]["number_of_replicas"] = int(self._number_of_replicas)
-            return template
+        template = json.loads(_read_resource(self.script_dir, template_name))
+        if self._number_of_shards is not None:
+            if int(self._number_of_shards) < 1:
+                raise exceptions.SystemSetupError(
+                    f"The setting: datastore.number_of_shards must be >= 1. Please "
+                    f"check the configuration in {self._config.config_file.location}"
+                )
+            template["template"]["settings"]["index"]["number_of_shards"] = int(self._number_of_shards)
+        if self._number_of_replicas is not None:
+            template["template"]["settings"]["index"]["number_of_replicas"] = int(self._number_of_replicas)
+        return template
 
 
 class ComponentTemplateProvider(IndexTemplateProvider):
@@ -439,8 +579,7 @@ class ComponentTemplateProvider(IndexTemplateProvider):
         Data streams should rely on ES administrator to provide shard/replica
         settings via @custom component templates.
         """
-        with open("%s/resources/%s.json" % (self.script_dir, template_name), encoding="utf-8") as f:
-            return json.load(f)
+        return json.loads(_read_resource(self.script_dir, template_name))
 
     def _get_component_templates(self, name, template_name, lifecycle_policy_name, include_ilm=True):
         template = self._read(template_name)["template"]
@@ -502,11 +641,20 @@ class IndexHandler:
         self._es_store_type = es_store_type
         self.logger = logging.getLogger(f"{self._es_store_type.metric_name}{__name__}")
         self._client = client
+        # these settings are checked on every flush, so only look them up once
+        self._use_data_streams = convert.to_bool(
+            self._config.opts("reporting", "datastore.use_data_streams", default_value=True, mandatory=False)
+        )
+        self._overwrite_templates = convert.to_bool(
+            self._config.opts(section="reporting", key="datastore.overwrite_existing_templates", default_value=False, mandatory=False)
+        )
         self._index_template_provider = ComponentTemplateProvider(cfg) if self.use_data_streams else IndexTemplateProvider(cfg)
+        # metrics stores resolve the index name of the current race for every query
+        self._index_names = {}
 
     @property
     def use_data_streams(self):
-        return convert.to_bool(self._config.opts("reporting", "datastore.use_data_streams", default_value=True, mandatory=False))
+        return self._use_data_streams
 
     @property
     def is_serverless(self):
@@ -514,16 +662,18 @@ class IndexHandler:
 
     @property
     def overwrite_templates(self):
-        return convert.to_bool(
-            self._config.opts(section="reporting", key="datastore.overwrite_existing_templates", default_value=False, mandatory=False)
-        )
+        return self._overwrite_templates
 
     def index_name(self, race_timestamp=None):
-        if self.use_data_streams:
-            return f"{self._es_store_type.index_prefix}{self._es_store_type.data_stream_version}"
-        else:
-            ts = time.from_iso8601(race_timestamp) if isinstance(race_timestamp, str) else race_timestamp
-            return f"{self._es_store_type.index_prefix}{ts.year:04d}-{ts.month:02d}"
+        index_name = self._index_names.get(race_timestamp)
+        if index_name is None:
+            if self.use_data_streams:
+                index_name = f"{self._es_store_type.index_prefix}{self._es_store_type.data_stream_version}"
+            else:
+                ts = time.from_iso8601(race_timestamp) if isinstance(race_timestamp, str) else race_timestamp
+                index_name = f"{self._es_store_type.index_prefix}{ts.year:04d}-{ts.month:02d}"
+            self._index_names[race_timestamp] = index_name
+        return index_name
 
     def ensure_index_template(self, create=False):
         if self.use_data_streams:
@@ -539,8 +689,7 @@ class IndexHandler:
         return self._index_template_provider.annotations_template()
 
     def _ilm_default_template(self, policy_name):
-        with open("%s/resources/%s.json" % (self._index_template_provider.script_dir, policy_name), encoding="utf-8") as f:
-            return json.dumps(json.load(f))
+        return json.dumps(json.loads(_read_resource(self._index_template_provider.script_dir, policy_name)))
 
     def _data_stream_template(self, component_templates):
         return json.dumps(
@@ -700,10 +849,7 @@ def metrics_store(cfg: types.Config, read_only=True, track=None, challenge=None,
 
 
 def metrics_store_class(cfg: types.Config):
-    if cfg.opts("reporting", "datastore.type") == "elasticsearch":
-        return EsMetricsStore
-    else:
-        return InMemoryMetricsStore
+    return METRICS_STORES.get(cfg.opts("reporting", "datastore.type"), InMemoryMetricsStore)
 
 
 class SampleType(IntEnum):
@@ -711,6 +857,10 @@ class SampleType(IntEnum):
     Normal = 1
 
 
+# The name of each sample type as it is stored in metrics records
+_SAMPLE_TYPE_NAME = {sample_type: sample_type.name.lower() for sample_type in SampleType}
+
+
 SECRET_TRACK_PARAM_PLACEHOLDER = "<hidden>"
 
 
@@ -725,6 +875,11 @@ def track_params_for_reporting(track_params):
     return {k: (SECRET_TRACK_PARAM_PLACEHOLDER if str(k).startswith("secret_") else v) for k, v in track_params.items()}
 
 
+# Record mappers are called once per matching doc, so we use itemgetter instead of lambdas to avoid a Python-level call per record.
+_doc_value = operator.itemgetter("value")
+_doc_unit = operator.itemgetter("unit")
+
+
 class MetricsStore:  # pylint: disable=too-many-public-methods
     """
     Abstract metrics store
@@ -747,6 +902,7 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         self._car = None
         self._car_name = None
         self._environment_name = cfg.opts("system", "env.name")
+        self._race_properties = self._create_race_properties()
         self.opened = False
         if meta_info is None:
             self._meta_info = {}
@@ -757,6 +913,8 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
             self._meta_info[MetaInfoScope.cluster] = {}
         if MetaInfoScope.node not in self._meta_info:
             self._meta_info[MetaInfoScope.node] = {}
+        # merged cluster and node level meta-info per node name (``None`` for cluster level), rebuilt when meta-info changes
+        self._merged_meta_info = {}
         self._clock = clock
         self._stop_watch = self._clock.stop_watch()
         self.logger = logging.getLogger(__name__)
@@ -791,6 +949,7 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         assert self._race_timestamp is not None, "Attempting to open metrics store without a race timestamp"
 
         self._car_name = "+".join(self._car) if isinstance(self._car, list) else self._car
+        self._race_properties = self._create_race_properties()
 
         self.logger.info(
             "Opening metrics store for race timestamp=[%s], track=[%s], challenge=[%s], car=[%s]",
@@ -803,12 +962,28 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         user_tags = self._config.opts("race", "user.tags", default_value={}, mandatory=False)
         for k, v in user_tags.items():
             # prefix user tag with "tag_" in order to avoid clashes with our internal meta data
-            self.add_meta_info(MetaInfoScope.cluster, None, "tag_%s" % k, v)
+            self.add_meta_info(MetaInfoScope.cluster, None, f"tag_{k}", v)
         # Don't store it for each metrics record as it's probably sufficient on race level
         # self.add_meta_info(MetaInfoScope.cluster, None, "rally_version", version.version())
         self._stop_watch.start()
         self.opened = True
 
+    def _create_race_properties(self):
+        """
+        :return: The properties that are identical for all metrics records of the currently opened race.
+        """
+        race_properties = {
+            "race-id": self._race_id,
+            "race-timestamp": self._race_timestamp,
+            "environment": self._environment_name,
+            "track": self._track,
+            "challenge": self._challenge,
+            "car": self._car_name,
+        }
+        if self._track_params:
+            race_properties["track-params"] = self._track_params
+        return race_properties
+
     def reset_relative_time(self):
         """
         Resets the internal relative-time counter to zero.
@@ -850,12 +1025,30 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
             self._meta_info[MetaInfoScope.node][scope_key][key] = value
         else:
             raise exceptions.SystemSetupError("Unknown meta info scope [%s]" % scope)
+        self._merged_meta_info = {}
 
     def _clear_meta_info(self):
         """
         Clears all internally stored meta-info. This is considered Rally internal API and not intended for normal client consumption.
         """
         self._meta_info = {MetaInfoScope.cluster: {}, MetaInfoScope.node: {}}
+        self._merged_meta_info = {}
+
+    def _meta_info_for(self, node_name=None):
+        """
+        Determines the meta-info for a metrics record. The result is shared between all records of the same level so callers must
+        not modify it.
+
+        :param node_name: The name of the node for node level metrics records or ``None`` for cluster level metrics records.
+        :return: The cluster level meta-info merged with the node level meta-info of the provided node.
+        """
+        meta = self._merged_meta_info.get(node_name)
+        if meta is None:
+            meta = self._meta_info[MetaInfoScope.cluster].copy()
+            if node_name in self._meta_info[MetaInfoScope.node]:
+                meta.update(self._meta_info[MetaInfoScope.node][node_name])
+            self._merged_meta_info[node_name] = meta
+        return meta
 
     @property
     def open_context(self):
@@ -973,15 +1166,13 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         meta_data=None,
     ):
         if level == MetaInfoScope.cluster:
-            meta = self._meta_info[MetaInfoScope.cluster].copy()
+            meta = self._meta_info_for()
         elif level == MetaInfoScope.node:
-            meta = self._meta_info[MetaInfoScope.cluster].copy()
-            if level_key in self._meta_info[MetaInfoScope.node]:
-                meta.update(self._meta_info[MetaInfoScope.node][level_key])
+            meta = self._meta_info_for(level_key)
         else:
             raise exceptions.SystemSetupError("Unknown meta info level [%s] for metric [%s]" % (level, name))
         if meta_data:
-            meta.update(meta_data)
+            meta = {**meta, **meta_data}
 
         if absolute_time is None:
             absolute_time = self._clock.now()
@@ -991,16 +1182,11 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         doc = {
             "@timestamp": time.to_epoch_millis(absolute_time),
             "relative-time": convert.seconds_to_ms(relative_time),
-            "race-id": self._race_id,
-            "race-timestamp": self._race_timestamp,
-            "environment": self._environment_name,
-            "track": self._track,
-            "challenge": self._challenge,
-            "car": self._car_name,
+            **self._race_properties,
             "name": name,
             "value": value,
             "unit": unit,
-            "sample-type": sample_type.name.lower(),
+            "sample-type": _SAMPLE_TYPE_NAME[sample_type],
             "meta": meta,
         }
         if task:
@@ -1009,8 +1195,6 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
             doc["operation"] = operation
         if operation_type:
             doc["operation-type"] = operation_type
-        if self._track_params:
-            doc["track-params"] = self._track_params
         self._add(doc)
 
     def put_doc(self, doc, level=None, node_name=None, meta_data=None, absolute_time=None, relative_time=None):
@@ -1027,40 +1211,27 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
                Defaults to None. The metrics store will derive the timestamp automatically.
         """
         if level == MetaInfoScope.cluster:
-            meta = self._meta_info[MetaInfoScope.cluster].copy()
+            meta = self._meta_info_for()
         elif level == MetaInfoScope.node:
-            meta = self._meta_info[MetaInfoScope.cluster].copy()
-            if node_name in self._meta_info[MetaInfoScope.node]:
-                meta.update(self._meta_info[MetaInfoScope.node][node_name])
+            meta = self._meta_info_for(node_name)
         elif level is None:
             meta = None
         else:
             raise exceptions.SystemSetupError(f"Unknown meta info level [{level}]")
 
         if meta and meta_data:
-            meta.update(meta_data)
+            meta = {**meta, **meta_data}
 
         if absolute_time is None:
             absolute_time = self._clock.now()
         if relative_time is None:
             relative_time = self._stop_watch.split_time()
 
-        doc.update(
-            {
-                "@timestamp": time.to_epoch_millis(absolute_time),
-                "relative-time": convert.seconds_to_ms(relative_time),
-                "race-id": self._race_id,
-                "race-timestamp": self._race_timestamp,
-                "environment": self._environment_name,
-                "track": self._track,
-                "challenge": self._challenge,
-                "car": self._car_name,
-            }
-        )
+        doc["@timestamp"] = time.to_epoch_millis(absolute_time)
+        doc["relative-time"] = convert.seconds_to_ms(relative_time)
+        doc.update(self._race_properties)
         if meta:
             doc["meta"] = meta
-        if self._track_params:
-            doc["track-params"] = self._track_params
 
         self._add(doc)
 
@@ -1072,7 +1243,12 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         """
         if memento:
             self.logger.debug("Restoring in-memory representation of metrics store.")
-            for doc in pickle.loads(zlib.decompress(memento)):
+            if memento.startswith(_ZSTD_MAGIC_NUMBER):
+                docs = pickle.load(zstandard.ZstdDecompressor().stream_reader(memento))
+            else:
+                # zlib-compressed representation of older Rally versions
+                docs = pickle.loads(zlib.decompress(memento))
+            for doc in docs:
                 self._add(doc)
 
     def to_externalizable(self, clear=False):
@@ -1093,7 +1269,7 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         node_name=None,
         task=None,
         cluster_name=None,
-        mapper=lambda doc: doc["value"],
+        mapper=_doc_value,
         sort_key=None,
         sort_reverse=False,
     ):
@@ -1127,7 +1303,25 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         :param cluster_name The name of the cluster (multi-cluster mode). Optional.
         :return: A list of all values for the given metric.
         """
-        return self._get(name, task, operation_type, sample_type, node_name, cluster_name, lambda doc: doc["value"])
+        return self._get(name, task, operation_type, sample_type, node_name, cluster_name, _doc_value)
+
+    def get_by_name(self, names):
+        """
+        Gets all raw values for each of the given metric names.
+
+        :param names: The metric names to query.
+        :return: A dict with a list of all values for each of the given metric names.
+        """
+        return {name: self.get(name) for name in names}
+
+    def get_raw_by_name(self, names):
+        """
+        Gets all raw records for each of the given metric names.
+
+        :param names: The metric names to query.
+        :return: A dict with a list of all raw records for each of the given metric names.
+        """
+        return {name: self.get_raw(name) for name in names}
 
     def get_raw(
         self,
@@ -1165,7 +1359,7 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         :return: The corresponding unit for the given metric name or None if no metric record is available.
         """
         # does not make too much sense to ask for a sample type here
-        return self._first_or_none(self._get(name, task, operation_type, None, node_name, cluster_name, lambda doc: doc["unit"]))
+        return self._first_or_none(self._get(name, task, operation_type, None, node_name, cluster_name, _doc_unit))
 
     def _get(self, name, task, operation_type, sample_type, node_name, cluster_name, mapper):
         raise NotImplementedError("abstract method")
@@ -1246,12 +1440,33 @@ class MetricsStore:  # pylint: disable=too-many-public-methods
         stats = self.get_stats(name, task, operation_type, sample_type, cluster_name=cluster_name)
         return stats["avg"] if stats else None
 
+    def get_summary(self, name, task=None, operation_type=None, sample_type=None, cluster_name=None):
+        """
+        Retrieves standard statistics and the median of the given metric. Stores may override this to retrieve both at once.
+
+        :param name: The metric name to query.
+        :param task The task name to query. Optional.
+        :param operation_type The operation type to query. Optional.
+        :param sample_type The sample type to query. Optional. By default, all samples are considered.
+        :param cluster_name The name of the cluster (multi-cluster mode). Optional.
+        :return: A metric_stats structure with an additional key ``median`` or ``None`` if there are no matching samples.
+        """
+        stats = self.get_stats(name, task, operation_type, sample_type, cluster_name=cluster_name)
+        if not stats:
+            return None
+        stats["median"] = self.get_median(name, task, operation_type, sample_type, cluster_name=cluster_name)
+        return stats
+
 
 class EsMetricsStore(MetricsStore):
     """
     A metrics store for telemetry backed by Elasticsearch.
     """
 
+    # Elasticsearch's default index.max_result_window
+    _GET_PAGE_SIZE = 10000
+    _GET_PIT_KEEP_ALIVE = "1m"
+
     def __init__(
         self,
         cfg: types.Config,
@@ -1271,10 +1486,24 @@ class EsMetricsStore(MetricsStore):
         self._client = client_factory_class(cfg).create()
         self._index_handler = IndexHandler(self._config, self._client, EsStoreType.metrics)
         self._docs = None
+        self._max_buffered_docs = int(cfg.opts("reporting", "datastore.buffer.max_docs", default_value=10000, mandatory=False))
         self._flush_consecutive_failures = 0
+        # flushes a full buffer so that producers (e.g. the driver or telemetry samplers) never block on the metrics store
+        self._flusher = None
+        self._flusher_stop = None
+        self._flush_requested = None
+        # no new flusher is started once the store is being closed
+        self._flusher_stopping = False
+        self._buffer_flush_failed = False
+        # reporting queries the same metrics repeatedly (e.g. stats, percentiles and error rate per task) so we build filters once
+        self._query_filters = {}
+        # aggregation results by query, only valid until new docs are flushed
+        self._aggregations = {}
 
     def open(self, race_id=None, race_timestamp=None, track_name=None, challenge_name=None, car_name=None, ctx=None, create=False):
         self._docs = []
+        self._aggregations = {}
+        self._flusher_stopping = False
         MetricsStore.open(self, race_id, race_timestamp, track_name, challenge_name, car_name, ctx, create)
         self._index_handler.ensure_index_template(create=create)
 
@@ -1297,63 +1526,58 @@ class EsMetricsStore(MetricsStore):
             self._client.refresh(index=index_name)
 
     _MAX_FLUSH_FAILURES = 10
+    # a bit more than a bulk request may take including all of its retries
+    _FLUSHER_STOP_TIMEOUT = 240
 
     def flush(self, refresh=True, closing=False):
+        if closing:
+            # let an in-flight background flush finish so that the closing flush sees all remaining docs
+            self._stop_flusher()
+        # flushed docs may change the result of any aggregation
+        self._aggregations = {}
         with self._docs_lock:
             docs_to_flush = self._docs
             self._docs = []
 
-        indexed = False
-        if not docs_to_flush:
-            # A quiet cycle breaks the consecutive-failure chain.
-            self._flush_consecutive_failures = 0
         if docs_to_flush:
             try:
-                sw = time.StopWatch()
-                sw.start()
-                self._client.bulk_index(
-                    index=self._index_handler.index_name(self._race_timestamp),
-                    items=docs_to_flush,
-                    use_data_streams=self._index_handler.use_data_streams,
-                )
-                sw.stop()
-                indexed = True
-                self._flush_consecutive_failures = 0
-                self.logger.info(
-                    "Successfully added %d metrics documents for race timestamp=[%s],"
-                    " track=[%s], challenge=[%s], car=[%s] in [%f] seconds.",
-                    len(docs_to_flush),
-                    self._race_timestamp,
-                    self._track,
-                    self._challenge,
-                    self._car,
-                    sw.total_time(),
-                )
-            except exceptions.SystemSetupError:
-                raise
-            except exceptions.RallyError as e:
-                if closing:
-                    # The closing flush is the last chance to persist, so surface the failure.
-                    raise exceptions.RallyError(f"Failed to flush {len(docs_to_flush)} final metrics docs on close.", cause=e) from e
-                self._flush_consecutive_failures += 1
-                if self._flush_consecutive_failures >= self._MAX_FLUSH_FAILURES:
-                    raise exceptions.RallyError(
-                        f"Metrics store unreachable after {self._MAX_FLUSH_FAILURES} consecutive flush failures, failing benchmark.",
-                        cause=e,
-                    ) from e
-                with self._docs_lock:
-                    self._docs = docs_to_flush + self._docs
-                self.logger.warning(
-                    "Failed to flush %d metrics docs (attempt %d/%d), re-queuing for next cycle: %s",
-                    len(docs_to_flush),
-                    self._flush_consecutive_failures,
-                    self._MAX_FLUSH_FAILURES,
-                    e,
-                )
-                return
+                self._flush_docs(docs_to_flush, refresh, closing)
+            finally:
+                # a query that has run concurrently may have cached results from before the bulk request or the refresh
+                self._aggregations = {}
+        else:
+            # A quiet cycle breaks the consecutive-failure chain.
+            self._flush_consecutive_failures = 0
+
+    def _flush_docs(self, docs_to_flush, refresh, closing):
+        try:
+            self._bulk_index(docs_to_flush)
+            self._flush_consecutive_failures = 0
+            self._buffer_flush_failed = False
+        except exceptions.SystemSetupError:
+            raise
+        except exceptions.RallyError as e:
+            if closing:
+                # The closing flush is the last chance to persist, so surface the failure.
+                raise exceptions.RallyError(f"Failed to flush {len(docs_to_flush)} final metrics docs on close.", cause=e) from e
+            self._flush_consecutive_failures += 1
+            if self._flush_consecutive_failures >= self._MAX_FLUSH_FAILURES:
+                raise exceptions.RallyError(
+                    f"Metrics store unreachable after {self._MAX_FLUSH_FAILURES} consecutive flush failures, failing benchmark.",
+                    cause=e,
+                ) from e
+            self._requeue(docs_to_flush)
+            self.logger.warning(
+                "Failed to flush %d metrics docs (attempt %d/%d), re-queuing for next cycle: %s",
+                len(docs_to_flush),
+                self._flush_consecutive_failures,
+                self._MAX_FLUSH_FAILURES,
+                e,
+            )
+            return
 
         # Refresh only when docs were written — skipping when idle avoids a blocking call.
-        if refresh and indexed:
+        if refresh:
             try:
                 self._client.refresh(
                     index=self._index_handler.index_name(self._race_timestamp),
@@ -1361,23 +1585,146 @@ class EsMetricsStore(MetricsStore):
             except exceptions.RallyError as e:
                 self.logger.warning("Metrics store refresh failed (docs were indexed successfully): %s", e)
 
+    def _bulk_index(self, docs):
+        sw = time.StopWatch()
+        sw.start()
+        self._client.bulk_index(
+            index=self._index_handler.index_name(self._race_timestamp),
+            items=docs,
+            use_data_streams=self._index_handler.use_data_streams,
+        )
+        sw.stop()
+        self.logger.info(
+            "Successfully added %d metrics documents for race timestamp=[%s], track=[%s], challenge=[%s], car=[%s] in [%f] seconds.",
+            len(docs),
+            self._race_timestamp,
+            self._track,
+            self._challenge,
+            self._car,
+            sw.total_time(),
+        )
+
+    def _requeue(self, docs):
+        with self._docs_lock:
+            self._docs = docs + self._docs
+
     def _add(self, doc):
         with self._docs_lock:
             self._docs.append(doc)
+            # leave retries after failed flushes to the regular flush cycle
+            full = 0 < self._max_buffered_docs <= len(self._docs) and not self._buffer_flush_failed and not self._flusher_stopping
+            if full and self._flusher is None:
+                self._flush_requested = threading.Event()
+                self._flusher_stop = threading.Event()
+                self._flusher = threading.Thread(
+                    target=self._flush_full_buffers,
+                    args=(self._flush_requested, self._flusher_stop),
+                    name="metrics-store-flusher",
+                    daemon=True,
+                )
+                self._flusher.start()
+            flush_requested = self._flush_requested
+        if full:
+            flush_requested.set()
+
+    def _flush_full_buffers(self, flush_requested, stop):
+        while True:
+            flush_requested.wait()
+            flush_requested.clear()
+            if stop.is_set():
+                # leave the remaining docs to the closing flush
+                return
+            with self._docs_lock:
+                docs_to_flush = self._docs
+                self._docs = []
+            if docs_to_flush:
+                try:
+                    self._bulk_index(docs_to_flush)
+                    self._aggregations = {}
+                except exceptions.RallyError as e:
+                    # Neither raise nor count this failure: the regular flush cycle retries and decides when to give up.
+                    self._buffer_flush_failed = True
+                    self._requeue(docs_to_flush)
+                    self.logger.warning(
+                        "Failed to flush %d metrics docs from a full buffer, re-queuing for next cycle: %s", len(docs_to_flush), e
+                    )
+
+    def _stop_flusher(self):
+        with self._docs_lock:
+            self._flusher_stopping = True
+            flusher = self._flusher
+            flush_requested = self._flush_requested
+            stop = self._flusher_stop
+            self._flusher = None
+        if flusher is not None:
+            stop.set()
+            flush_requested.set()
+            # wait for an in-flight background flush
+            flusher.join(timeout=self._FLUSHER_STOP_TIMEOUT)
+            if flusher.is_alive():
+                self.logger.warning("Background flush of metrics docs did not finish within [%d] seconds.", self._FLUSHER_STOP_TIMEOUT)
 
     def _get(self, name, task, operation_type, sample_type, node_name, cluster_name, mapper):
-        query = {
-            "query": self._query_by_name(name, task, operation_type, sample_type, node_name, cluster_name),
-            "track_total_hits": True,
-            "size": 10000,
+        return self._search_all(self._query_by_name(name, task, operation_type, sample_type, node_name, cluster_name), mapper)
+
+    def get_by_name(self, names):
+        values = {name: [] for name in names}
+        for name, value in self._search_all(self._query_by_names(names), operator.itemgetter("name", "value")):
+            values[name].append(value)
+        return values
+
+    def get_raw_by_name(self, names):
+        docs = {name: [] for name in names}
+        for doc in self._search_all(self._query_by_names(names), lambda doc: doc):
+            docs[doc["name"]].append(doc)
+        return docs
+
+    def _query_by_names(self, names):
+        # retrieve all metrics at once instead of issuing one query per metric
+        return {
+            "bool": {
+                "filter": [
+                    {
+                        "term": {
+                            "race-id": self._race_id,
+                        },
+                    },
+                    {
+                        "terms": {
+                            "name": list(names),
+                        },
+                    },
+                ],
+            },
         }
-        self.logger.debug("Issuing get against index=[%s], query=[%s].", self._index_handler.index_name(self._race_timestamp), query)
-        result = self._client.search(index=self._index_handler.index_name(self._race_timestamp), body=query)
-        es_count = result["hits"]["total"]["value"]
-        self.logger.debug("Metrics query found [%s] results.", es_count)
-        if es_count != len(result["hits"]["hits"]):
-            self.logger.warning("Metrics query returned [%d] out of [%s] matching docs.", len(result["hits"]["hits"]), es_count)
-        return [mapper(v["_source"]) for v in result["hits"]["hits"]]
+
+    def _search_all(self, query, mapper):
+        index = self._index_handler.index_name(self._race_timestamp)
+        # All pages need a consistent view of the index. Searching within a point in time from the first page on lets us continue
+        # after the last hit of each page instead of fetching any page twice.
+        pit_id = self._client.open_point_in_time(index=index, keep_alive=self._GET_PIT_KEEP_ALIVE)
+        try:
+            values = []
+            body = {
+                "query": query,
+                "size": self._GET_PAGE_SIZE,
+                "track_total_hits": False,
+                "sort": ["_shard_doc"],
+            }
+            self.logger.debug("Issuing get against index=[%s], query=[%s].", index, body)
+            while True:
+                body["pit"] = {"id": pit_id, "keep_alive": self._GET_PIT_KEEP_ALIVE}
+                result = self._client.search(index=None, body=body)
+                # the point in time id may change between requests
+                pit_id = result.get("pit_id", pit_id)
+                hits = result["hits"]["hits"]
+                values.extend(mapper(v["_source"]) for v in hits)
+                if len(hits) < self._GET_PAGE_SIZE:
+                    self.logger.debug("Metrics query found [%d] results.", len(values))
+                    return values
+                body["search_after"] = hits[-1]["sort"]
+        finally:
+            self._client.close_point_in_time(pit_id)
 
     def get_one(
         self,
@@ -1386,7 +1733,7 @@ class EsMetricsStore(MetricsStore):
         node_name=None,
         task=None,
         cluster_name=None,
-        mapper=lambda doc: doc["value"],
+        mapper=_doc_value,
         sort_key=None,
         sort_reverse=False,
     ):
@@ -1454,9 +1801,18 @@ class EsMetricsStore(MetricsStore):
         :return: A metric_stats structure. For details please refer to
         https://www.elastic.co/guide/en/elasticsearch/reference/current/search-aggregations-metrics-stats-aggregation.html
         """
+        key = ("stats", name, task, operation_type, sample_type, cluster_name)
+        if key not in self._aggregations:
+            self._aggregations[key] = self._get_stats(name, task, operation_type, sample_type, cluster_name)
+        # callers own the returned stats
+        return dict(self._aggregations[key])
+
+    def _get_stats(self, name, task, operation_type, sample_type, cluster_name):
         query = {
             "query": self._query_by_name(name, task, operation_type, sample_type, None, cluster_name),
             "size": 0,
+            # the stats aggregation contains the doc count already
+            "track_total_hits": False,
             "aggs": {
                 "metric_stats": {
                     "stats": {
@@ -1469,6 +1825,41 @@ class EsMetricsStore(MetricsStore):
         result = self._client.search(index=self._index_handler.index_name(self._race_timestamp), body=query)
         return result["aggregations"]["metric_stats"]
 
+    def get_summary(self, name, task=None, operation_type=None, sample_type=None, cluster_name=None):
+        key = ("summary", name, task, operation_type, sample_type, cluster_name)
+        if key not in self._aggregations:
+            self._aggregations[key] = self._get_summary(name, task, operation_type, sample_type, cluster_name)
+        result = self._aggregations[key]
+        # callers own the returned summary
+        return dict(result) if result is not None else None
+
+    def _get_summary(self, name, task, operation_type, sample_type, cluster_name):
+        # retrieve stats and median with a single request
+        query = {
+            "query": self._query_by_name(name, task, operation_type, sample_type, None, cluster_name),
+            "size": 0,
+            "track_total_hits": False,
+            "aggs": {
+                "metric_stats": {
+                    "stats": {
+                        "field": "value",
+                    },
+                },
+                "percentile_stats": {
+                    "percentiles": {
+                        "field": "value",
+                        "percents": ["50.0"],
+                    },
+                },
+            },
+        }
+        self.logger.debug("Issuing get_summary against index=[%s], query=[%s]", self._index_handler.index_name(self._race_timestamp), query)
+        result = self._client.search(index=self._index_handler.index_name(self._race_timestamp), body=query)
+        stats = result["aggregations"]["metric_stats"]
+        if not stats["count"]:
+            return None
+        return {**stats, "median": result["aggregations"]["percentile_stats"]["values"]["50.0"]}
+
     def task_cluster_names(self):
         query = {
             "query": {
@@ -1499,9 +1890,19 @@ class EsMetricsStore(MetricsStore):
     def get_percentiles(self, name, task=None, operation_type=None, sample_type=None, percentiles=None, cluster_name=None):
         if percentiles is None:
             percentiles = [99, 99.9, 100]
+        key = ("percentiles", name, task, operation_type, sample_type, cluster_name, tuple(percentiles))
+        if key not in self._aggregations:
+            self._aggregations[key] = self._get_percentiles(name, task, operation_type, sample_type, percentiles, cluster_name)
+        result = self._aggregations[key]
+        # callers own the returned percentiles
+        return result.copy() if result is not None else None
+
+    def _get_percentiles(self, name, task, operation_type, sample_type, percentiles, cluster_name):
         query = {
             "query": self._query_by_name(name, task, operation_type, sample_type, None, cluster_name),
             "size": 0,
+            # we can tell from the percentile values whether there were any matching docs
+            "track_total_hits": False,
             "aggs": {
                 "percentile_stats": {
                     "percentiles": {
@@ -1515,36 +1916,42 @@ class EsMetricsStore(MetricsStore):
             "Issuing get_percentiles against index=[%s], query=[%s]", self._index_handler.index_name(self._race_timestamp), query
         )
         result = self._client.search(index=self._index_handler.index_name(self._race_timestamp), body=query)
-        hits = result["hits"]["total"]
-        # Elasticsearch 7.0+
-        if isinstance(hits, dict):
-            hits = hits["value"]
-        self.logger.debug("get_percentiles produced %d hits", hits)
-        if hits > 0:
-            raw = result["aggregations"]["percentile_stats"]["values"]
+        raw = result["aggregations"]["percentile_stats"]["values"]
+        # Elasticsearch returns null for all percentiles if there are no matching docs
+        if any(v is not None for v in raw.values()):
             return collections.OrderedDict(sorted(raw.items(), key=lambda t: float(t[0])))
         else:
+            self.logger.debug("get_percentiles found no matching docs")
             return None
 
     def _query_by_name(self, name, task, operation_type, sample_type, node_name, cluster_name=None):
-        q = {
+        key = (self._race_id, name, task, operation_type, sample_type, node_name, cluster_name)
+        filters = self._query_filters.get(key)
+        if filters is None:
+            filters = self._query_filters[key] = self._create_query_filters(*key)
+        # hand out a new list so the cached filters cannot be modified through a query
+        return {
             "bool": {
-                "filter": [
-                    {
-                        "term": {
-                            "race-id": self._race_id,
-                        },
-                    },
-                    {
-                        "term": {
-                            "name": name,
-                        },
-                    },
-                ],
+                "filter": list(filters),
             },
         }
+
+    @staticmethod
+    def _create_query_filters(race_id, name, task, operation_type, sample_type, node_name, cluster_name):
+        filters = [
+            {
+                "term": {
+                    "race-id": race_id,
+                },
+            },
+            {
+                "term": {
+                    "name": name,
+                },
+            },
+        ]
         if task:
-            q["bool"]["filter"].append(
+            filters.append(
                 {
                     "term": {
                         "task": task,
@@ -1552,7 +1959,7 @@ class EsMetricsStore(MetricsStore):
                 },
             )
         if operation_type:
-            q["bool"]["filter"].append(
+            filters.append(
                 {
                     "term": {
                         "operation-type": operation_type,
@@ -1560,15 +1967,15 @@ class EsMetricsStore(MetricsStore):
                 },
             )
         if sample_type:
-            q["bool"]["filter"].append(
+            filters.append(
                 {
                     "term": {
-                        "sample-type": sample_type.name.lower(),
+                        "sample-type": _SAMPLE_TYPE_NAME[sample_type],
                     },
                 },
             )
         if node_name:
-            q["bool"]["filter"].append(
+            filters.append(
                 {
                     "term": {
                         "meta.node_name": node_name,
@@ -1576,14 +1983,14 @@ class EsMetricsStore(MetricsStore):
                 },
             )
         if cluster_name:
-            q["bool"]["filter"].append(
+            filters.append(
                 {
                     "term": {
                         "meta.cluster": cluster_name,
                     },
                 },
             )
-        return q
+        return tuple(filters)
 
     def to_externalizable(self, clear=False):
         # no need for an externalizable representation - stores everything directly
@@ -1593,6 +2000,33 @@ class EsMetricsStore(MetricsStore):
         return "Elasticsearch metrics store"
 
 
+_ZSTD_MAGIC_NUMBER = b"\x28\xb5\x2f\xfd"
+
+
+class _CompressingWriter:
+    """
+    A file-like object that compresses everything written to it, so pickled data never needs to be held uncompressed in memory.
+    """
+
+    def __init__(self, compressor):
+        """
+        :param compressor: A compression object with ``compress()`` and ``flush()`` like the ones returned by ``zlib.compressobj()``.
+        """
+        self._compressor = compressor
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(self._compressor.compress(data))
+        return len(data)
+
+    def getvalue(self):
+        """
+        :return: All data written so far in compressed form. The writer must not be used anymore afterwards.
+        """
+        self._chunks.append(self._compressor.flush())
+        return b"".join(self._chunks)
+
+
 class InMemoryMetricsStore(MetricsStore):
     def __init__(self, cfg: types.Config, clock=time.Clock, meta_info=None):
         """
@@ -1605,20 +2039,32 @@ class InMemoryMetricsStore(MetricsStore):
         """
         super().__init__(cfg=cfg, clock=clock, meta_info=meta_info)
         self.docs = []
+        # all queries filter by metric name, so we index docs by name to avoid scanning all of them
+        self._docs_by_name = collections.defaultdict(list)
+        # [success count, error count] of service time samples keyed by (task, operation type, sample type, cluster)
+        self._request_counts = collections.defaultdict(lambda: [0, 0])
 
     def __del__(self):
         """
         Deletes the metrics store instance.
         """
         del self.docs
+        del self._docs_by_name
+        del self._request_counts
 
     def _add(self, doc):
         with self._docs_lock:
-            self.docs.append(doc)
+            self._add_unlocked(doc)
 
     # for testing purposes only
     def _add_unlocked(self, doc):
         self.docs.append(doc)
+        self._docs_by_name[doc["name"]].append(doc)
+        # we can use any request metrics record (i.e. service time or latency) to calculate the error rate
+        if doc["name"] == "service_time":
+            meta = doc.get("meta", {})
+            key = (doc.get("task"), doc.get("operation-type"), doc.get("sample-type"), meta.get("cluster"))
+            self._request_counts[key][meta.get("success") is False] += 1
 
     def flush(self, refresh=True, closing=False):
         pass
@@ -1627,9 +2073,13 @@ class InMemoryMetricsStore(MetricsStore):
         with self._docs_lock:
             if clear:
                 docs, self.docs = self.docs, []
+                self._docs_by_name = collections.defaultdict(list)
+                self._request_counts = collections.defaultdict(lambda: [0, 0])
             else:
                 docs = list(self.docs)
-        compressed = zlib.compress(pickle.dumps(docs))
+        compressor = _CompressingWriter(zstandard.ZstdCompressor(level=3).compressobj())
+        pickle.Pickler(compressor).dump(docs)
+        compressed = compressor.getvalue()
         self.logger.debug(
             "Compression changed size of metric store from [%d] bytes to [%d] bytes", sys.getsizeof(docs, -1), sys.getsizeof(compressed, -1)
         )
@@ -1641,9 +2091,10 @@ class InMemoryMetricsStore(MetricsStore):
         result = collections.OrderedDict()
         values = self.get(name, task, operation_type, sample_type, cluster_name=cluster_name)
         if len(values) > 0:
-            sorted_values = sorted(values)
+            # get() returns a new list so we can sort it in place instead of creating a sorted copy
+            values.sort()
             for percentile in percentiles:
-                result[percentile] = self.percentile_value(sorted_values, percentile)
+                result[percentile] = self.percentile_value(values, percentile)
         return result
 
     @staticmethod
@@ -1671,18 +2122,16 @@ class InMemoryMetricsStore(MetricsStore):
     def get_error_rate(self, task, operation_type=None, sample_type=None, cluster_name=None):
         error = 0
         total_count = 0
-        for doc in self.docs:
-            # we can use any request metrics record (i.e. service time or latency)
+        sample_type_name = _SAMPLE_TYPE_NAME[sample_type] if sample_type is not None else None
+        for (doc_task, doc_operation_type, doc_sample_type, doc_cluster), (success_count, error_count) in self._request_counts.items():
             if (
-                doc["name"] == "service_time"
-                and doc["task"] == task
-                and (operation_type is None or doc["operation-type"] == operation_type)
-                and (sample_type is None or doc["sample-type"] == sample_type.name.lower())
-                and (cluster_name is None or doc.get("meta", {}).get("cluster") == cluster_name)
+                doc_task == task
+                and (operation_type is None or doc_operation_type == operation_type)
+                and (sample_type_name is None or doc_sample_type == sample_type_name)
+                and (cluster_name is None or doc_cluster == cluster_name)
             ):
-                total_count += 1
-                if doc["meta"]["success"] is False:
-                    error += 1
+                total_count += success_count + error_count
+                error += error_count
         if total_count > 0:
             return error / total_count
         else:
@@ -1690,14 +2139,30 @@ class InMemoryMetricsStore(MetricsStore):
 
     def get_stats(self, name, task=None, operation_type=None, sample_type=SampleType.Normal, cluster_name=None):
         values = self.get(name, task, operation_type, sample_type, cluster_name=cluster_name)
-        sorted_values = sorted(values)
-        if len(sorted_values) > 0:
+        if len(values) > 0:
+            return {
+                "count": len(values),
+                "min": min(values),
+                "max": max(values),
+                # fsum() avoids the rounding errors that accumulate in sum() for long series of floats
+                "avg": math.fsum(values) / len(values),
+                "sum": sum(values),
+            }
+        else:
+            return None
+
+    def get_summary(self, name, task=None, operation_type=None, sample_type=None, cluster_name=None):
+        values = self.get(name, task, operation_type, sample_type, cluster_name=cluster_name)
+        if len(values) > 0:
+            # get() returns a new list so we can sort it in place instead of creating a sorted copy
+            values.sort()
             return {
-                "count": len(sorted_values),
-                "min": sorted_values[0],
-                "max": sorted_values[-1],
-                "avg": statistics.mean(sorted_values),
-                "sum": sum(sorted_values),
+                "count": len(values),
+                "min": values[0],
+                "max": values[-1],
+                "avg": math.fsum(values) / len(values),
+                "sum": sum(values),
+                "median": self.percentile_value(values, 50),
             }
         else:
             return None
@@ -1708,16 +2173,23 @@ class InMemoryMetricsStore(MetricsStore):
         }
 
     def _get(self, name, task, operation_type, sample_type, node_name, cluster_name, mapper):
-        return [
-            mapper(doc)
-            for doc in self.docs
-            if doc["name"] == name
-            and (task is None or doc["task"] == task)
+        # together with the default itemgetter-based mappers, map() extracts values in C
+        return list(map(mapper, self._matching_docs(name, task, operation_type, sample_type, node_name, cluster_name)))
+
+    def _matching_docs(self, name, task, operation_type, sample_type, node_name, cluster_name):
+        docs = self._docs_by_name.get(name, ())
+        if task is None and operation_type is None and sample_type is None and node_name is None and cluster_name is None:
+            return docs
+        sample_type_name = _SAMPLE_TYPE_NAME[sample_type] if sample_type is not None else None
+        return (
+            doc
+            for doc in docs
+            if (task is None or doc["task"] == task)
             and (operation_type is None or doc["operation-type"] == operation_type)
-            and (sample_type is None or doc["sample-type"] == sample_type.name.lower())
+            and (sample_type_name is None or doc["sample-type"] == sample_type_name)
             and (node_name is None or doc.get("meta", {}).get("node_name") == node_name)
             and (cluster_name is None or doc.get("meta", {}).get("cluster") == cluster_name)
-        ]
+        )
 
     def get_one(
         self,
@@ -1726,29 +2198,30 @@ class InMemoryMetricsStore(MetricsStore):
         node_name=None,
         task=None,
         cluster_name=None,
-        mapper=lambda doc: doc["value"],
+        mapper=_doc_value,
         sort_key=None,
         sort_reverse=False,
     ):
+        matching_docs = iter(self._matching_docs(name, task, None, sample_type, node_name, cluster_name))
         if sort_key:
-            docs = sorted(self.docs, key=lambda k: k[sort_key], reverse=sort_reverse)
+            # we only need the first doc in sort order so there is no need to sort all of them
+            select = max if sort_reverse else min
+            doc = select(matching_docs, key=operator.itemgetter(sort_key), default=None)
         else:
-            docs = self.docs
-        for doc in docs:
-            if (
-                doc["name"] == name
-                and (task is None or doc["task"] == task)
-                and (sample_type is None or doc["sample-type"] == sample_type.name.lower())
-                and (node_name is None or doc.get("meta", {}).get("node_name") == node_name)
-                and (cluster_name is None or doc.get("meta", {}).get("cluster") == cluster_name)
-            ):
-                return mapper(doc)
-        return None
+            doc = next(matching_docs, None)
+        return mapper(doc) if doc is not None else None
 
     def __str__(self):
         return "in-memory metrics store"
 
 
+# Metrics store implementations by ``datastore.type``. All other types use the in-memory metrics store.
+METRICS_STORES = {
+    "elasticsearch": EsMetricsStore,
+    "in-memory": InMemoryMetricsStore,
+}
+
+
 def race_store(cfg: types.Config):
     """
     Creates a proper race store based on the current configuration.
@@ -1889,6 +2362,34 @@ def create_race(cfg: types.Config, track, challenge, track_revision=None):
 
 
 class Race:
+    # Listing races creates one instance per stored race.
+    __slots__ = (
+        "rally_version",
+        "rally_revision",
+        "environment_name",
+        "race_id",
+        "race_timestamp",
+        "pipeline",
+        "multi_cluster",
+        "user_tags",
+        "track",
+        "track_params",
+        "challenge",
+        "car",
+        "car_params",
+        "plugin_params",
+        "track_revision",
+        "team_revision",
+        "distribution_version",
+        "distribution_flavor",
+        "revision",
+        "results",
+        "meta_data",
+        "target_id",
+        "target_platform",
+        "target_auth_type",
+    )
+
     def __init__(
         self,
         rally_version,
@@ -1990,16 +2491,13 @@ class Race:
         }
         if self.results:
             if isinstance(self.results, list):
-                d["results"] = [r.as_dict() if hasattr(r, "as_dict") else r for r in self.results]
-            elif hasattr(self.results, "as_dict"):
-                d["results"] = self.results.as_dict()
+                d["results"] = [self._results_as_dict(r) for r in self.results]
             else:
-                d["results"] = self.results
+                d["results"] = self._results_as_dict(self.results)
         if self.track_revision:
             d["track-revision"] = self.track_revision
-        if self.challenge:
-            if not hasattr(self.challenge, "auto_generated") or not self.challenge.auto_generated:
-                d["challenge"] = self.challenge_name
+        if self.challenge and not getattr(self.challenge, "auto_generated", False):
+            d["challenge"] = self.challenge_name
         reporting_params = track_params_for_reporting(self.track_params)
         if reporting_params:
             d["track-params"] = reporting_params
@@ -2009,10 +2507,25 @@ class Race:
             d["plugin-params"] = self.plugin_params
         return d
 
+    @staticmethod
+    def _results_as_dict(results):
+        # results are either stats objects (when the race is created) or plain dicts (when the race has been loaded)
+        as_dict = getattr(results, "as_dict", None)
+        return as_dict() if as_dict is not None else results
+
     def to_result_dicts(self):
         """
         :return: a list of dicts, suitable for persisting the results of this race in a format that is Kibana-friendly.
         """
+        return list(self.iter_result_dicts())
+
+    def iter_result_dicts(self):
+        """
+        Lazy variant of ``to_result_dicts()``. Each result doc contains a copy of all race-level fields so this avoids that all of
+        them need to be held in memory at once when they are bulk-indexed.
+
+        :return: a generator of dicts, suitable for persisting the results of this race in a format that is Kibana-friendly.
+        """
         result_template = {
             "@timestamp": time.to_epoch_millis(self.race_timestamp.timestamp()),
             "rally-version": self.rally_version,
@@ -2029,8 +2542,12 @@ class Race:
             # allow to logically delete records, e.g. for UI purposes when we only want to show the latest result
             "active": True,
         }
-        if versions.is_version_identifier(self.distribution_version):
-            result_template["distribution-major-version"] = versions.major_version(self.distribution_version)
+        if self.distribution_version is not None:
+            try:
+                result_template["distribution-major-version"] = versions.major_version(self.distribution_version)
+            except exceptions.InvalidSyntax:
+                # e.g. serverless
+                pass
         if self.team_revision:
             result_template["team-revision"] = self.team_revision
         if self.track_revision:
@@ -2051,44 +2568,39 @@ class Race:
         if self.meta_data:
             result_template["meta"] = self.meta_data
 
-        all_results = []
-
         results_list = self.results if isinstance(self.results, list) else [self.results]
         for stats in results_list:
             for item in stats.as_flat_list():
-                result = result_template.copy()
-                result.update(item)
-                all_results.append(result)
-
-        return all_results
+                yield {**result_template, **item}
 
     @classmethod
     def from_dict(cls, d):
-        user_tags = d.get("user-tags", {})
+        # bind the lookups once, this is called for every stored race when listing races
+        get = d.get
         # TODO: cluster is optional for BWC. This can be removed after some grace period.
-        cluster = d.get("cluster", {})
+        cluster_get = get("cluster", {}).get
         return Race(
             d["rally-version"],
-            d.get("rally-revision"),
+            get("rally-revision"),
             d["environment"],
             d["race-id"],
             time.from_iso8601(d["race-timestamp"]),
             d["pipeline"],
-            user_tags,
+            get("user-tags", {}),
             d["track"],
-            d.get("track-params"),
-            d.get("challenge"),
+            get("track-params"),
+            get("challenge"),
             d["car"],
-            d.get("car-params"),
-            d.get("plugin-params"),
-            track_revision=d.get("track-revision"),
-            team_revision=cluster.get("team-revision"),
-            distribution_version=cluster.get("distribution-version"),
-            distribution_flavor=cluster.get("distribution-flavor"),
-            revision=cluster.get("revision"),
-            results=d.get("results"),
-            meta_data=d.get("meta", {}),
-            multi_cluster=d.get("multi-cluster", False),
+            get("car-params"),
+            get("plugin-params"),
+            track_revision=get("track-revision"),
+            team_revision=cluster_get("team-revision"),
+            distribution_version=cluster_get("distribution-version"),
+            distribution_flavor=cluster_get("distribution-flavor"),
+            revision=cluster_get("revision"),
+            results=get("results"),
+            meta_data=get("meta", {}),
+            multi_cluster=get("multi-cluster", False),
         )
 
 
@@ -2174,8 +2686,24 @@ class CompositeRaceStore:
         return self.es_store.find_by_race_id(race_id)
 
     def store_race(self, race):
-        self.file_store.store_race(race)
-        self.es_store.store_race(race)
+        # write the local file while the (network-bound) Elasticsearch request is in flight
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="es-race-store") as pool:
+            es_stored = pool.submit(self.es_store.store_race, race)
+            file_error = None
+            try:
+                self.file_store.store_race(race)
+            except Exception as e:
+                file_error = e
+            # always wait for the Elasticsearch request so that none of the errors is lost
+            es_error = es_stored.exception()
+        if es_error and file_error:
+            raise exceptions.RallyError(
+                f"Could not store race in the Elasticsearch race store [{es_error}] nor as a file [{file_error}].", cause=es_error
+            ) from file_error
+        if es_error:
+            raise es_error
+        if file_error:
+            raise file_error
 
     def delete_race(self):
         return self.es_store.delete_race()
@@ -2194,12 +2722,44 @@ class CompositeRaceStore:
 
 
 class FileRaceStore(RaceStore):
+    _MAX_LOAD_THREADS = 8
+
     def store_race(self, race):
         doc = race.as_dict()
         race_path = paths.race_root(self.cfg, race_id=race.race_id)
         io.ensure_dir(race_path)
-        with open(self._race_file(), mode="w", encoding="utf-8") as f:
-            f.write(json.dumps(doc, indent=True, ensure_ascii=False))
+        with open(self._race_file(), mode="wb") as f:
+            f.write(self._dumps(doc))
+
+    @staticmethod
+    def _dumps(doc):
+        """
+        :return: The UTF-8 encoded JSON representation of the provided race doc, indented by one space per level. Uses the optional
+                 ``orjson`` package if it is installed as it is considerably faster than the ``json`` module for large races.
+        """
+        # orjson would write non-finite floats as null whereas the json module writes e.g. NaN
+        if orjson is not None and not FileRaceStore._has_non_finite_float(doc):
+            try:
+                indented = orjson.dumps(doc, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                # e.g. integers that exceed 64 bits, which only the json module supports
+                pass
+            else:
+                # orjson only supports an indentation of two spaces per level
+                return FileRaceStore._ORJSON_INDENT.sub(lambda m: m.group(0)[: len(m.group(0)) // 2], indented)
+        return json.dumps(doc, indent=True, ensure_ascii=False).encode("utf-8")
+
+    _ORJSON_INDENT = re.compile(rb"^(?:  )+", re.MULTILINE)
+
+    @staticmethod
+    def _has_non_finite_float(value):
+        if isinstance(value, float):
+            return not math.isfinite(value)
+        if isinstance(value, dict):
+            return any(FileRaceStore._has_non_finite_float(v) for v in value.values())
+        if isinstance(value, (list, tuple)):
+            return any(FileRaceStore._has_non_finite_float(v) for v in value)
+        return False
 
     def _race_file(self, race_id=None):
         return os.path.join(paths.race_root(cfg=self.cfg, race_id=race_id), "race.json")
@@ -2229,8 +2789,17 @@ class FileRaceStore(RaceStore):
                 return races[0]
         raise exceptions.NotFound(f"No race with race id [{race_id}]")
 
+    @staticmethod
+    def _load_race(race_file):
+        # noinspection PyBroadException
+        try:
+            with open(race_file, mode="rb") as f:
+                return Race.from_dict(json.loads(f.read()))
+        except BaseException:
+            logging.getLogger(__name__).exception("Could not load race file [%s] (incompatible format?) Skipping...", race_file)
+            return None
+
     def _to_races(self, results):
-        races = []
         track = self._track()
         name = self._benchmark_name()
         pattern = "%Y%m%d"
@@ -2239,30 +2808,32 @@ class FileRaceStore(RaceStore):
         challenge = self._challenge()
         user_tags = self._user_tags()
 
-        for result in results:
-            # noinspection PyBroadException
-            try:
-                with open(result, encoding="utf-8") as f:
-                    races.append(Race.from_dict(json.loads(f.read())))
-            except BaseException:
-                logging.getLogger(__name__).exception("Could not load race file [%s] (incompatible format?) Skipping...", result)
+        if len(results) > 1:
+            # reading many race files is mostly waiting for I/O, so we read them concurrently
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(results), self._MAX_LOAD_THREADS)) as pool:
+                races = [race for race in pool.map(self._load_race, results) if race is not None]
+        else:
+            races = [race for race in map(self._load_race, results) if race is not None]
 
-        if track:
-            races = filter(lambda r: r.track == track, races)
-        if name:
-            filtered_on_name = filter(lambda r: r.user_tags.get("name") == name, races)
-            filtered_on_benchmark_name = filter(lambda r: r.user_tags.get("benchmark-name") == name, races)
-            races = list(filtered_on_name) + list(filtered_on_benchmark_name)
-        if from_date:
-            races = filter(lambda r: r.race_timestamp.date() >= datetime.datetime.strptime(from_date, pattern).date(), races)
-        if to_date:
-            races = filter(lambda r: r.race_timestamp.date() <= datetime.datetime.strptime(to_date, pattern).date(), races)
-        if challenge:
-            races = filter(lambda r: r.challenge == challenge, races)
-        if user_tags:
-            races = filter(lambda r: all(r.user_tags.get(k) == v for k, v in user_tags.items()), races)
+        from_date = datetime.datetime.strptime(from_date, pattern).date() if from_date else None
+        to_date = datetime.datetime.strptime(to_date, pattern).date() if to_date else None
+
+        def matches(r):
+            if track and r.track != track:
+                return False
+            if name and name not in (r.user_tags.get("name"), r.user_tags.get("benchmark-name")):
+                return False
+            if from_date and r.race_timestamp.date() < from_date:
+                return False
+            if to_date and r.race_timestamp.date() > to_date:
+                return False
+            if challenge and r.challenge != challenge:
+                return False
+            return not user_tags or all(r.user_tags.get(k) == v for k, v in user_tags.items())
 
-        return sorted(races, key=lambda r: r.race_timestamp, reverse=True)
+        races = [r for r in races if matches(r)]
+        races.sort(key=operator.attrgetter("race_timestamp"), reverse=True)
+        return races
 
 
 class EsRaceStore(RaceStore):
@@ -2270,6 +2841,8 @@ class EsRaceStore(RaceStore):
     A metric store for race information backed by Elasticsearch.
     """
 
+    _LIST_PAGE_SIZE = 500
+
     def __init__(self, cfg: types.Config, client_factory_class=EsClientFactory):
         """
         Creates a new metrics store.
@@ -2282,11 +2855,15 @@ class EsRaceStore(RaceStore):
         self.client = client_factory_class(cfg).create()
         self._index_handler = IndexHandler(self.cfg, self.client, EsStoreType.races)
         self._race_stored = False
+        self._index_template_ensured = False
 
     def store_race(self, race):
         assert race.race_timestamp is not None, "Attempted to store race with race_timestamp=None"
 
-        self._index_handler.ensure_index_template(create=True)
+        # a race is stored repeatedly while it progresses but the template only needs to be checked once
+        if not self._index_template_ensured:
+            self._index_handler.ensure_index_template(create=True)
+            self._index_template_ensured = True
         index = self._index_handler.index_name(race.race_timestamp)
 
         if self._index_handler.use_data_streams and self._race_stored:
@@ -2434,16 +3011,38 @@ class EsRaceStore(RaceStore):
             else:
                 console.println(f"Would delete {len(races)} races: {races} in environment {environment}.")
         else:
+            # delete all races at once so the number of requests does not depend on the number of races
+            race_filter = {"term": {"race-id": races[0]}} if len(races) == 1 else {"terms": {"race-id": races}}
+            selector = {"query": {"bool": {"filter": [{"term": {"environment": environment}}, race_filter]}}}
+            # with multiple races we can't tell from the number of deleted docs which races existed so we check upfront
+            found = self._race_ids_with_results(selector, len(races)) if len(races) > 1 else None
+            self.client.delete_by_query(index="rally-races-*", body=selector)
+            self.client.delete_by_query(index="rally-metrics-*", body=selector)
+            result = self.client.delete_by_query(index="rally-results-*", body=selector)
+            if found is None:
+                found = set(races) if result["deleted"] > 0 else set()
             for race_id in races:
-                selector = {"query": {"bool": {"filter": [{"term": {"environment": environment}}, {"term": {"race-id": race_id}}]}}}
-                self.client.delete_by_query(index="rally-races-*", body=selector)
-                self.client.delete_by_query(index="rally-metrics-*", body=selector)
-                result = self.client.delete_by_query(index="rally-results-*", body=selector)
-                if result["deleted"] > 0:
+                if race_id in found:
                     console.println(f"Successfully deleted [{race_id}] in environment [{environment}].")
                 else:
                     console.println(f"Did not find [{race_id}] in environment [{environment}].")
 
+    def _race_ids_with_results(self, selector, race_count):
+        query = {
+            **selector,
+            "size": 0,
+            "aggs": {
+                "races": {
+                    "terms": {
+                        "field": "race-id",
+                        "size": race_count,
+                    },
+                },
+            },
+        }
+        result = self.client.search(index="rally-results-*", body=query)
+        return {b["key"] for b in result["aggregations"]["races"]["buckets"]}
+
     def list(self):
         track = self._track()
         name = self._benchmark_name()
@@ -2451,6 +3050,7 @@ class EsRaceStore(RaceStore):
         to_date = self._to_date()
         challenge = self._challenge()
         user_tags = self._user_tags()
+        max_results = self._max_results()
 
         filters = [
             {
@@ -2467,7 +3067,7 @@ class EsRaceStore(RaceStore):
                     "filter": filters,
                 },
             },
-            "size": self._max_results(),
+            "size": min(max_results, self._LIST_PAGE_SIZE),
             "sort": [
                 {
                     "race-timestamp": {
@@ -2476,6 +3076,9 @@ class EsRaceStore(RaceStore):
                 },
             ],
         }
+        if max_results > self._LIST_PAGE_SIZE:
+            # we need a unique sort order to page with search_after
+            query["sort"].append({"race-id": {"order": "asc"}})
         if track:
             query["query"]["bool"]["filter"].append({"term": {"track": track}})
         if name:
@@ -2491,10 +3094,17 @@ class EsRaceStore(RaceStore):
         # Elasticsearch 7.0+
         if isinstance(hits, dict):
             hits = hits["value"]
-        if hits > 0:
-            return [Race.from_dict(v["_source"]) for v in result["hits"]["hits"]]
-        else:
+        if hits == 0:
             return []
+        page = result["hits"]["hits"]
+        races = [Race.from_dict(v["_source"]) for v in page]
+        # fetch large result sets in pages instead of letting Elasticsearch sort and return all of them at once
+        while len(page) == query["size"] and len(races) < max_results:
+            query["search_after"] = page[-1]["sort"]
+            query["size"] = min(max_results - len(races), self._LIST_PAGE_SIZE)
+            page = self.client.search(index="%s*" % EsStoreType.races.index_prefix, body=query)["hits"]["hits"]
+            races.extend(Race.from_dict(v["_source"]) for v in page)
+        return races
 
     def find_by_race_id(self, race_id):
         query = {
@@ -2539,14 +3149,17 @@ class EsResultsStore:
         self.cfg = cfg
         self.client = client_factory_class(cfg).create()
         self._index_handler = IndexHandler(self.cfg, self.client, EsStoreType.results)
+        self._index_template_ensured = False
 
     def store_results(self, race):
         assert race.race_timestamp is not None, "Attempted to store race with race_timestamp=None"
 
-        self._index_handler.ensure_index_template(create=True)
+        if not self._index_template_ensured:
+            self._index_handler.ensure_index_template(create=True)
+            self._index_template_ensured = True
         self.client.bulk_index(
             index=self._index_handler.index_name(race.race_timestamp),
-            items=race.to_result_dicts(),
+            items=race.iter_result_dicts(),
             use_data_streams=self._index_handler.use_data_streams,
         )
 
@@ -2561,28 +3174,30 @@ class NoopResultsStore:
 
 
 # helper function for encoding and decoding float keys so that the Elasticsearch metrics store can save them.
+# Reporting encodes the same few percentiles over and over again, so we cache them.
+@functools.lru_cache(maxsize=128)
 def encode_float_key(k):
     # ensure that the key is indeed a float to unify the representation (e.g. 50 should be represented as "50_0")
     return str(float(k)).replace(".", "_")
 
 
+# the smallest sample size for which the corresponding percentiles are reported
+_PERCENTILE_SAMPLE_SIZES = (1, 2, 10, 100, 1000, 10000)
+_PERCENTILES = (
+    (100,),
+    (50, 100),
+    (50, 90, 100),
+    (50, 90, 99, 100),
+    (50, 90, 99, 99.9, 100),
+    (50, 90, 99, 99.9, 99.99, 100),
+)
+
+
 def percentiles_for_sample_size(sample_size):
     # if needed we can come up with something smarter but it'll do for now
     if sample_size < 1:
         raise AssertionError("Percentiles require at least one sample")
-
-    if sample_size == 1:
-        return [100]
-    elif 1 < sample_size < 10:
-        return [50, 100]
-    elif 10 <= sample_size < 100:
-        return [50, 90, 100]
-    elif 100 <= sample_size < 1000:
-        return [50, 90, 99, 100]
-    elif 1000 <= sample_size < 10000:
-        return [50, 90, 99, 99.9, 100]
-    else:
-        return [50, 90, 99, 99.9, 99.99, 100]
+    return _PERCENTILES[bisect.bisect_right(_PERCENTILE_SAMPLE_SIZES, sample_size) - 1]
 
 
 class GlobalStatsCalculator:
@@ -2614,35 +3229,88 @@ class GlobalStatsCalculator:
                         duration,
                         self.merge(self.track.meta_data, self.challenge.meta_data, task.operation.meta_data, task.meta_data),
                     )
+        # retrieve all summed metrics at once instead of issuing one query per metric
+        sums = self.sums(
+            [
+                "indexing_total_time",
+                "indexing_throttle_time",
+                "merges_total_time",
+                "merges_total_count",
+                "refresh_total_time",
+                "refresh_total_count",
+                "flush_total_time",
+                "flush_total_count",
+                "merges_total_throttled_time",
+                "node_total_young_gen_gc_time",
+                "node_total_young_gen_gc_count",
+                "node_total_old_gen_gc_time",
+                "node_total_old_gen_gc_count",
+                "node_total_zgc_cycles_gc_time",
+                "node_total_zgc_cycles_gc_count",
+                "node_total_zgc_pauses_gc_time",
+                "node_total_zgc_pauses_gc_count",
+                "dataset_size_in_bytes",
+                "store_size_in_bytes",
+                "translog_size_in_bytes",
+                "ingest_pipeline_cluster_count",
+                "ingest_pipeline_cluster_time",
+                "ingest_pipeline_cluster_failed",
+            ]
+        )
+
+        # likewise, retrieve all raw records that are needed at once
+        raw = self.store.get_raw_by_name(
+            [
+                "indexing_total_time",
+                "indexing_throttle_time",
+                "merges_total_time",
+                "refresh_total_time",
+                "flush_total_time",
+                "merges_total_throttled_time",
+                "ml_processing_time",
+                "total_transform_processing_time",
+                "total_transform_index_time",
+                "total_transform_search_time",
+                "total_transform_throughput",
+                "disk_usage_total",
+                "disk_usage_inverted_index",
+                "disk_usage_stored_fields",
+                "disk_usage_doc_values",
+                "disk_usage_points",
+                "disk_usage_norms",
+                "disk_usage_term_vectors",
+            ]
+        )
+
         self.logger.debug("Gathering indexing metrics.")
-        result.total_time = self.sum("indexing_total_time")
-        result.total_time_per_shard = self.shard_stats("indexing_total_time")
-        result.indexing_throttle_time = self.sum("indexing_throttle_time")
-        result.indexing_throttle_time_per_shard = self.shard_stats("indexing_throttle_time")
-        result.merge_time = self.sum("merges_total_time")
-        result.merge_time_per_shard = self.shard_stats("merges_total_time")
-        result.merge_count = self.sum("merges_total_count")
-        result.refresh_time = self.sum("refresh_total_time")
-        result.refresh_time_per_shard = self.shard_stats("refresh_total_time")
-        result.refresh_count = self.sum("refresh_total_count")
-        result.flush_time = self.sum("flush_total_time")
-        result.flush_time_per_shard = self.shard_stats("flush_total_time")
-        result.flush_count = self.sum("flush_total_count")
-        result.merge_throttle_time = self.sum("merges_total_throttled_time")
-        result.merge_throttle_time_per_shard = self.shard_stats("merges_total_throttled_time")
+        result.total_time = sums["indexing_total_time"]
+        result.total_time_per_shard = self._shard_stats(raw["indexing_total_time"])
+        result.indexing_throttle_time = sums["indexing_throttle_time"]
+        result.indexing_throttle_time_per_shard = self._shard_stats(raw["indexing_throttle_time"])
+        result.merge_time = sums["merges_total_time"]
+        result.merge_time_per_shard = self._shard_stats(raw["merges_total_time"])
+        result.merge_count = sums["merges_total_count"]
+        result.refresh_time = sums["refresh_total_time"]
+        result.refresh_time_per_shard = self._shard_stats(raw["refresh_total_time"])
+        result.refresh_count = sums["refresh_total_count"]
+        result.flush_time = sums["flush_total_time"]
+        result.flush_time_per_shard = self._shard_stats(raw["flush_total_time"])
+        result.flush_count = sums["flush_total_count"]
+        result.merge_throttle_time = sums["merges_total_throttled_time"]
+        result.merge_throttle_time_per_shard = self._shard_stats(raw["merges_total_throttled_time"])
 
         self.logger.debug("Gathering ML max processing times.")
-        result.ml_processing_time = self.ml_processing_time_stats()
+        result.ml_processing_time = self._ml_processing_time_stats(raw["ml_processing_time"])
 
         self.logger.debug("Gathering garbage collection metrics.")
-        result.young_gc_time = self.sum("node_total_young_gen_gc_time")
-        result.young_gc_count = self.sum("node_total_young_gen_gc_count")
-        result.old_gc_time = self.sum("node_total_old_gen_gc_time")
-        result.old_gc_count = self.sum("node_total_old_gen_gc_count")
-        result.zgc_cycles_gc_time = self.sum("node_total_zgc_cycles_gc_time")
-        result.zgc_cycles_gc_count = self.sum("node_total_zgc_cycles_gc_count")
-        result.zgc_pauses_gc_time = self.sum("node_total_zgc_pauses_gc_time")
-        result.zgc_pauses_gc_count = self.sum("node_total_zgc_pauses_gc_count")
+        result.young_gc_time = sums["node_total_young_gen_gc_time"]
+        result.young_gc_count = sums["node_total_young_gen_gc_count"]
+        result.old_gc_time = sums["node_total_old_gen_gc_time"]
+        result.old_gc_count = sums["node_total_old_gen_gc_count"]
+        result.zgc_cycles_gc_time = sums["node_total_zgc_cycles_gc_time"]
+        result.zgc_cycles_gc_count = sums["node_total_zgc_cycles_gc_count"]
+        result.zgc_pauses_gc_time = sums["node_total_zgc_pauses_gc_time"]
+        result.zgc_pauses_gc_count = sums["node_total_zgc_pauses_gc_count"]
 
         self.logger.debug("Gathering segment memory metrics.")
         result.memory_segments = self.median("segments_memory_in_bytes")
@@ -2651,82 +3319,61 @@ class GlobalStatsCalculator:
         result.memory_norms = self.median("segments_norms_memory_in_bytes")
         result.memory_points = self.median("segments_points_memory_in_bytes")
         result.memory_stored_fields = self.median("segments_stored_fields_memory_in_bytes")
-        result.dataset_size = self.sum("dataset_size_in_bytes")
-        result.store_size = self.sum("store_size_in_bytes")
-        result.translog_size = self.sum("translog_size_in_bytes")
+        result.dataset_size = sums["dataset_size_in_bytes"]
+        result.store_size = sums["store_size_in_bytes"]
+        result.translog_size = sums["translog_size_in_bytes"]
 
         # convert to int, fraction counts are senseless
         median_segment_count = self.median("segments_count")
         result.segment_count = int(median_segment_count) if median_segment_count is not None else median_segment_count
 
         self.logger.debug("Gathering transform processing times.")
-        result.total_transform_processing_times = self.total_transform_metric("total_transform_processing_time")
-        result.total_transform_index_times = self.total_transform_metric("total_transform_index_time")
-        result.total_transform_search_times = self.total_transform_metric("total_transform_search_time")
-        result.total_transform_throughput = self.total_transform_metric("total_transform_throughput")
+        result.total_transform_processing_times = self._total_transform_metric(raw["total_transform_processing_time"])
+        result.total_transform_index_times = self._total_transform_metric(raw["total_transform_index_time"])
+        result.total_transform_search_times = self._total_transform_metric(raw["total_transform_search_time"])
+        result.total_transform_throughput = self._total_transform_metric(raw["total_transform_throughput"])
 
         self.logger.debug("Gathering Ingest Pipeline metrics.")
-        result.ingest_pipeline_cluster_count = self.sum("ingest_pipeline_cluster_count")
-        result.ingest_pipeline_cluster_time = self.sum("ingest_pipeline_cluster_time")
-        result.ingest_pipeline_cluster_failed = self.sum("ingest_pipeline_cluster_failed")
+        result.ingest_pipeline_cluster_count = sums["ingest_pipeline_cluster_count"]
+        result.ingest_pipeline_cluster_time = sums["ingest_pipeline_cluster_time"]
+        result.ingest_pipeline_cluster_failed = sums["ingest_pipeline_cluster_failed"]
 
         self.logger.debug("Gathering disk usage metrics.")
-        result.disk_usage_total = self.disk_usage("disk_usage_total")
-        result.disk_usage_inverted_index = self.disk_usage("disk_usage_inverted_index")
-        result.disk_usage_stored_fields = self.disk_usage("disk_usage_stored_fields")
-        result.disk_usage_doc_values = self.disk_usage("disk_usage_doc_values")
-        result.disk_usage_points = self.disk_usage("disk_usage_points")
-        result.disk_usage_norms = self.disk_usage("disk_usage_norms")
-        result.disk_usage_term_vectors = self.disk_usage("disk_usage_term_vectors")
+        result.disk_usage_total = self._disk_usage(raw["disk_usage_total"])
+        result.disk_usage_inverted_index = self._disk_usage(raw["disk_usage_inverted_index"])
+        result.disk_usage_stored_fields = self._disk_usage(raw["disk_usage_stored_fields"])
+        result.disk_usage_doc_values = self._disk_usage(raw["disk_usage_doc_values"])
+        result.disk_usage_points = self._disk_usage(raw["disk_usage_points"])
+        result.disk_usage_norms = self._disk_usage(raw["disk_usage_norms"])
+        result.disk_usage_term_vectors = self._disk_usage(raw["disk_usage_term_vectors"])
 
         return result
 
-    def merge(self, *args):
-        # This is similar to dict(collections.ChainMap(args)) except that we skip `None` in our implementation.
-        result = {}
-        for arg in args:
-            if arg is not None:
-                result.update(arg)
-        return result
+    @staticmethod
+    def merge(track_meta_data, challenge_meta_data, operation_meta_data, task_meta_data):
+        # more specific meta-data takes precedence, any of them may be `None`
+        return {**(track_meta_data or {}), **(challenge_meta_data or {}), **(operation_meta_data or {}), **(task_meta_data or {})}
 
-    def sum(self, metric_name):
-        values = self.store.get(metric_name)
-        if values:
-            return sum(values)
-        else:
-            return None
+    def sums(self, metric_names):
+        return {metric_name: sum(values) if values else None for metric_name, values in self.store.get_by_name(metric_names).items()}
 
     def one(self, metric_name):
         return self.store.get_one(metric_name)
 
     def summary_stats(self, metric_name, task_name, operation_type, cluster_name=None):
-        mean = self.store.get_mean(
-            metric_name,
-            task=task_name,
-            operation_type=operation_type,
-            sample_type=SampleType.Normal,
-            cluster_name=cluster_name,
-        )
-        median = self.store.get_median(
-            metric_name,
-            task=task_name,
-            operation_type=operation_type,
-            sample_type=SampleType.Normal,
-            cluster_name=cluster_name,
-        )
         unit = self.store.get_unit(metric_name, task=task_name, operation_type=operation_type, cluster_name=cluster_name)
-        stats = self.store.get_stats(
+        stats = self.store.get_summary(
             metric_name,
             task=task_name,
             operation_type=operation_type,
             sample_type=SampleType.Normal,
             cluster_name=cluster_name,
         )
-        if mean and median and stats:
+        if stats and stats["avg"] and stats["median"]:
             return {
                 "min": stats["min"],
-                "mean": mean,
-                "median": median,
+                "mean": stats["avg"],
+                "median": stats["median"],
                 "max": stats["max"],
                 "unit": unit,
             }
@@ -2740,21 +3387,29 @@ class GlobalStatsCalculator:
             }
 
     def shard_stats(self, metric_name):
-        values = self.store.get_raw(metric_name, mapper=lambda doc: doc["per-shard"])
-        unit = self.store.get_unit(metric_name)
-        if values:
-            flat_values = [w for v in values for w in v]
+        return self._shard_stats(self.store.get_raw(metric_name))
+
+    @staticmethod
+    def _shard_stats(docs):
+        if docs:
+            values = [doc["per-shard"] for doc in docs]
+            unit = docs[0]["unit"]
+            # sort once, then min and max are at the boundaries (and median's own sort of already sorted values is linear)
+            flat_values = sorted(itertools.chain.from_iterable(values))
             return {
-                "min": min(flat_values),
+                "min": flat_values[0],
                 "median": statistics.median(flat_values),
-                "max": max(flat_values),
+                "max": flat_values[-1],
                 "unit": unit,
             }
         else:
             return {}
 
     def ml_processing_time_stats(self):
-        values = self.store.get_raw("ml_processing_time")
+        return self._ml_processing_time_stats(self.store.get_raw("ml_processing_time"))
+
+    @staticmethod
+    def _ml_processing_time_stats(values):
         result = []
         if values:
             for v in values:
@@ -2764,21 +3419,30 @@ class GlobalStatsCalculator:
         return result
 
     def total_transform_metric(self, metric_name):
-        values = self.store.get_raw(metric_name)
+        return self._total_transform_metric(self.store.get_raw(metric_name))
+
+    @staticmethod
+    def _total_transform_metric(values):
         result = []
         if values:
             for v in values:
-                transform_id = v.get("meta", {}).get("transform_id")
+                meta = v.get("meta")
+                transform_id = meta.get("transform_id") if meta else None
                 if transform_id is not None:
                     result.append({"id": transform_id, "mean": v["value"], "unit": v["unit"]})
         return result
 
     def disk_usage(self, metric_name):
-        values = self.store.get_raw(metric_name)
+        return self._disk_usage(self.store.get_raw(metric_name))
+
+    @staticmethod
+    def _disk_usage(values):
         result = []
         if values:
             for v in values:
-                meta = v.get("meta", {})
+                meta = v.get("meta")
+                if not meta:
+                    continue
                 index = meta.get("index")
                 field = meta.get("field")
                 if index is not None and field is not None:
@@ -2795,7 +3459,7 @@ class GlobalStatsCalculator:
             "service_time",
             task=task_name,
             cluster_name=cluster_name,
-            mapper=lambda doc: doc["relative-time"],
+            mapper=operator.itemgetter("relative-time"),
             sort_key="relative-time",
             sort_reverse=True,
         )
@@ -2828,18 +3492,11 @@ class GlobalStatsCalculator:
                 percentiles=percentiles_for_sample_size(sample_size),
                 cluster_name=cluster_name,
             )
-            mean = self.store.get_mean(
-                metric_name,
-                task=task,
-                operation_type=operation_type,
-                sample_type=sample_type,
-                cluster_name=cluster_name,
-            )
+            # the stats we've already retrieved contain the mean, so there is no need to query it again
+            mean = stats["avg"]
             unit = self.store.get_unit(metric_name, task=task, operation_type=operation_type, cluster_name=cluster_name)
-            stats = collections.OrderedDict()
-            for k, v in percentiles.items():
-                # safely encode so we don't have any dots in field names
-                stats[encode_float_key(k)] = v
+            # safely encode so we don't have any dots in field names
+            stats = {encode_float_key(k): v for k, v in percentiles.items()}
             stats["mean"] = mean
             stats["unit"] = unit
             return stats
@@ -2848,123 +3505,172 @@ class GlobalStatsCalculator:
 
 
 class GlobalStats:
+    # all metrics in the order in which they are stored, with a factory for their default value (if any)
+    _FIELDS = (
+        ("op_metrics", list),
+        ("total_time", None),
+        ("total_time_per_shard", dict),
+        ("indexing_throttle_time", None),
+        ("indexing_throttle_time_per_shard", dict),
+        ("merge_time", None),
+        ("merge_time_per_shard", dict),
+        ("merge_count", None),
+        ("refresh_time", None),
+        ("refresh_time_per_shard", dict),
+        ("refresh_count", None),
+        ("flush_time", None),
+        ("flush_time_per_shard", dict),
+        ("flush_count", None),
+        ("merge_throttle_time", None),
+        ("merge_throttle_time_per_shard", dict),
+        ("ml_processing_time", list),
+        ("young_gc_time", None),
+        ("young_gc_count", None),
+        ("old_gc_time", None),
+        ("old_gc_count", None),
+        ("zgc_cycles_gc_time", None),
+        ("zgc_cycles_gc_count", None),
+        ("zgc_pauses_gc_time", None),
+        ("zgc_pauses_gc_count", None),
+        ("memory_segments", None),
+        ("memory_doc_values", None),
+        ("memory_terms", None),
+        ("memory_norms", None),
+        ("memory_points", None),
+        ("memory_stored_fields", None),
+        ("dataset_size", None),
+        ("store_size", None),
+        ("translog_size", None),
+        ("segment_count", None),
+        ("total_transform_search_times", None),
+        ("total_transform_index_times", None),
+        ("total_transform_processing_times", None),
+        ("total_transform_throughput", None),
+        ("ingest_pipeline_cluster_count", None),
+        ("ingest_pipeline_cluster_time", None),
+        ("ingest_pipeline_cluster_failed", None),
+        ("disk_usage_total", None),
+        ("disk_usage_inverted_index", None),
+        ("disk_usage_stored_fields", None),
+        ("disk_usage_doc_values", None),
+        ("disk_usage_points", None),
+        ("disk_usage_norms", None),
+        ("disk_usage_term_vectors", None),
+    )
+    _DICT_KEYS = ("cluster_name", *(name for name, _ in _FIELDS))
+    # there is a fixed set of metrics so we avoid a per-instance __dict__
+    __slots__ = (*_DICT_KEYS, "_metrics_by_task")
+    # per-operation metrics and whether they are stored as a single value
+    _OP_METRIC_KEYS = (
+        ("throughput", False),
+        ("latency", False),
+        ("service_time", False),
+        ("processing_time", False),
+        ("error_rate", True),
+        ("duration", True),
+    )
+    # all metric names that as_flat_list() can produce, in the order in which it returns them
+    _FLAT_LIST_ORDER = tuple(
+        sorted({*(key for key, _ in _OP_METRIC_KEYS), *(name for name, _ in _FIELDS if name != "op_metrics")}),
+    )
+
     def __init__(self, d=None, cluster_name=None):
         self.cluster_name = cluster_name
-        self.op_metrics = self.v(d, "op_metrics", default=[])
-        self.total_time = self.v(d, "total_time")
-        self.total_time_per_shard = self.v(d, "total_time_per_shard", default={})
-        self.indexing_throttle_time = self.v(d, "indexing_throttle_time")
-        self.indexing_throttle_time_per_shard = self.v(d, "indexing_throttle_time_per_shard", default={})
-        self.merge_time = self.v(d, "merge_time")
-        self.merge_time_per_shard = self.v(d, "merge_time_per_shard", default={})
-        self.merge_count = self.v(d, "merge_count")
-        self.refresh_time = self.v(d, "refresh_time")
-        self.refresh_time_per_shard = self.v(d, "refresh_time_per_shard", default={})
-        self.refresh_count = self.v(d, "refresh_count")
-        self.flush_time = self.v(d, "flush_time")
-        self.flush_time_per_shard = self.v(d, "flush_time_per_shard", default={})
-        self.flush_count = self.v(d, "flush_count")
-        self.merge_throttle_time = self.v(d, "merge_throttle_time")
-        self.merge_throttle_time_per_shard = self.v(d, "merge_throttle_time_per_shard", default={})
-        self.ml_processing_time = self.v(d, "ml_processing_time", default=[])
-
-        self.young_gc_time = self.v(d, "young_gc_time")
-        self.young_gc_count = self.v(d, "young_gc_count")
-        self.old_gc_time = self.v(d, "old_gc_time")
-        self.old_gc_count = self.v(d, "old_gc_count")
-        self.zgc_cycles_gc_time = self.v(d, "zgc_cycles_gc_time")
-        self.zgc_cycles_gc_count = self.v(d, "zgc_cycles_gc_count")
-        self.zgc_pauses_gc_time = self.v(d, "zgc_pauses_gc_time")
-        self.zgc_pauses_gc_count = self.v(d, "zgc_pauses_gc_count")
-
-        self.memory_segments = self.v(d, "memory_segments")
-        self.memory_doc_values = self.v(d, "memory_doc_values")
-        self.memory_terms = self.v(d, "memory_terms")
-        self.memory_norms = self.v(d, "memory_norms")
-        self.memory_points = self.v(d, "memory_points")
-        self.memory_stored_fields = self.v(d, "memory_stored_fields")
-        self.dataset_size = self.v(d, "dataset_size")
-        self.store_size = self.v(d, "store_size")
-        self.translog_size = self.v(d, "translog_size")
-        self.segment_count = self.v(d, "segment_count")
-
-        self.total_transform_search_times = self.v(d, "total_transform_search_times")
-        self.total_transform_index_times = self.v(d, "total_transform_index_times")
-        self.total_transform_processing_times = self.v(d, "total_transform_processing_times")
-        self.total_transform_throughput = self.v(d, "total_transform_throughput")
-
-        self.ingest_pipeline_cluster_count = self.v(d, "ingest_pipeline_cluster_count")
-        self.ingest_pipeline_cluster_time = self.v(d, "ingest_pipeline_cluster_time")
-        self.ingest_pipeline_cluster_failed = self.v(d, "ingest_pipeline_cluster_failed")
-
-        self.disk_usage_total = self.v(d, "disk_usage_total")
-        self.disk_usage_inverted_index = self.v(d, "disk_usage_inverted_index")
-        self.disk_usage_stored_fields = self.v(d, "disk_usage_stored_fields")
-        self.disk_usage_doc_values = self.v(d, "disk_usage_doc_values")
-        self.disk_usage_points = self.v(d, "disk_usage_points")
-        self.disk_usage_norms = self.v(d, "disk_usage_norms")
-        self.disk_usage_term_vectors = self.v(d, "disk_usage_term_vectors")
+        # lazily built index of op_metrics by task name
+        self._metrics_by_task = None
+        d = d if isinstance(d, dict) else {}
+        for name, default_factory in self._FIELDS:
+            if name in d:
+                value = d[name]
+            else:
+                value = default_factory() if default_factory else None
+            setattr(self, name, value)
 
     def as_dict(self):
-        return self.__dict__
+        return {name: getattr(self, name) for name in self._DICT_KEYS}
 
     def as_flat_list(self):
-        def op_metrics(op_item, key, single_value=False):
-            doc = {"task": op_item["task"], "operation": op_item["operation"], "name": key}
-            if single_value:
-                doc["value"] = {"single": op_item[key]}
-            else:
-                doc["value"] = op_item[key]
-            if "meta" in op_item:
-                doc["meta"] = op_item["meta"]
-            if self.cluster_name is not None:
-                doc["cluster"] = self.cluster_name
-            return doc
-
-        all_results = []
+        results_by_name = collections.defaultdict(list)
         for metric, value in self.as_dict().items():
-            if metric == "cluster_name":
-                pass
-            elif metric == "op_metrics":
-                for item in value:
-                    if "throughput" in item:
-                        all_results.append(op_metrics(item, "throughput"))
-                    if "latency" in item:
-                        all_results.append(op_metrics(item, "latency"))
-                    if "service_time" in item:
-                        all_results.append(op_metrics(item, "service_time"))
-                    if "processing_time" in item:
-                        all_results.append(op_metrics(item, "processing_time"))
-                    if "error_rate" in item:
-                        all_results.append(op_metrics(item, "error_rate", single_value=True))
-                    if "duration" in item:
-                        all_results.append(op_metrics(item, "duration", single_value=True))
-            elif metric == "ml_processing_time":
-                for item in value:
-                    all_results.append(
-                        {
-                            "job": item["job"],
-                            "name": "ml_processing_time",
-                            "value": {"min": item["min"], "mean": item["mean"], "median": item["median"], "max": item["max"]},
-                        }
-                    )
-            elif metric.startswith("total_transform_") and value is not None:
-                for item in value:
-                    all_results.append({"id": item["id"], "name": metric, "value": {"single": item["mean"]}})
-            elif metric.startswith("disk_usage_") and value is not None:
-                for item in value:
-                    all_results.append({"index": item["index"], "field": item["field"], "name": metric, "value": {"single": item["value"]}})
-            elif metric.endswith("_time_per_shard"):
-                if value:
-                    all_results.append({"name": metric, "value": value})
-            elif value is not None:
-                result = {"name": metric, "value": {"single": value}}
-                all_results.append(result)
-        # sorting is just necessary to have a stable order for tests. As we just have a small number of metrics, the overhead is neglible.
-        return sorted(all_results, key=lambda m: m["name"])
+            flatten = self._flattener(metric)
+            if flatten is not None:
+                flatten(self, metric, value, results_by_name)
+        # a stable order is just necessary for tests. As all possible names are known upfront, we don't need to sort the results.
+        return [result for name in self._FLAT_LIST_ORDER for result in results_by_name.get(name, ())]
+
+    @staticmethod
+    @functools.cache
+    def _flattener(metric):
+        """
+        Determines how a metric is flattened by ``as_flat_list()``. The set of metric names is fixed, so the name-based dispatch only
+        needs to happen once per metric name instead of on every call.
 
-    def v(self, d, k, default=None):
-        return d.get(k, default) if isinstance(d, dict) else default
+        :param metric: The name of a metric (i.e. an attribute of this class).
+        :return: A function that adds the flattened representation of the metric to a dict of results by name or ``None`` if the metric
+                 is skipped.
+        """
+        if metric == "cluster_name":
+            return None
+        elif metric == "op_metrics":
+            return GlobalStats._flatten_op_metrics
+        elif metric == "ml_processing_time":
+            return GlobalStats._flatten_ml_processing_time
+        elif metric.startswith("total_transform_"):
+            return GlobalStats._flatten_transform_metric
+        elif metric.startswith("disk_usage_"):
+            return GlobalStats._flatten_disk_usage
+        elif metric.endswith("_time_per_shard"):
+            return GlobalStats._flatten_per_shard_metric
+        else:
+            return GlobalStats._flatten_single_value
+
+    def _op_metric(self, op_item, key, single_value=False):
+        doc = {"task": op_item["task"], "operation": op_item["operation"], "name": key}
+        if single_value:
+            doc["value"] = {"single": op_item[key]}
+        else:
+            doc["value"] = op_item[key]
+        if "meta" in op_item:
+            doc["meta"] = op_item["meta"]
+        if self.cluster_name is not None:
+            doc["cluster"] = self.cluster_name
+        return doc
+
+    def _flatten_op_metrics(self, metric, value, results_by_name):
+        for item in value:
+            for key, single_value in self._OP_METRIC_KEYS:
+                if key in item:
+                    results_by_name[key].append(self._op_metric(item, key, single_value))
+
+    def _flatten_ml_processing_time(self, metric, value, results_by_name):
+        for item in value:
+            results_by_name["ml_processing_time"].append(
+                {
+                    "job": item["job"],
+                    "name": "ml_processing_time",
+                    "value": {"min": item["min"], "mean": item["mean"], "median": item["median"], "max": item["max"]},
+                }
+            )
+
+    def _flatten_transform_metric(self, metric, value, results_by_name):
+        if value is not None:
+            for item in value:
+                results_by_name[metric].append({"id": item["id"], "name": metric, "value": {"single": item["mean"]}})
+
+    def _flatten_disk_usage(self, metric, value, results_by_name):
+        if value is not None:
+            for item in value:
+                results_by_name[metric].append(
+                    {"index": item["index"], "field": item["field"], "name": metric, "value": {"single": item["value"]}}
+                )
+
+    def _flatten_per_shard_metric(self, metric, value, results_by_name):
+        if value:
+            results_by_name[metric].append({"name": metric, "value": value})
+
+    def _flatten_single_value(self, metric, value, results_by_name):
+        if value is not None:
+            results_by_name[metric].append({"name": metric, "value": {"single": value}})
 
     def add_op_metrics(self, task, operation, throughput, latency, service_time, processing_time, error_rate, duration, meta):
         doc = {
@@ -2980,17 +3686,20 @@ class GlobalStats:
         if meta:
             doc["meta"] = meta
         self.op_metrics.append(doc)
+        self._metrics_by_task = None
 
     def tasks(self):
         # ensure we can read race.json files before Rally 0.8.0
         return [v.get("task", v["operation"]) for v in self.op_metrics]
 
     def metrics(self, task):
-        # ensure we can read race.json files before Rally 0.8.0
-        for r in self.op_metrics:
-            if r.get("task", r["operation"]) == task:
-                return r
-        return None
+        # reporters look up the metrics of every task, so we index them once instead of scanning op_metrics on each lookup
+        if self._metrics_by_task is None:
+            self._metrics_by_task = {}
+            for r in self.op_metrics:
+                # ensure we can read race.json files before Rally 0.8.0
+                self._metrics_by_task.setdefault(r.get("task", r["operation"]), r)
+        return self._metrics_by_task.get(task)
 
 
 class SystemStatsCalculator:
@@ -3020,11 +3729,10 @@ class SystemStatsCalculator:
 
 
 class SystemStats:
-    def __init__(self, d=None):
-        self.node_metrics = self.v(d, "node_metrics", default=[])
+    __slots__ = ("node_metrics",)
 
-    def v(self, d, k, default=None):
-        return d.get(k, default) if d else default
+    def __init__(self, d=None):
+        self.node_metrics = d.get("node_metrics", []) if d else []
 
     def add_node_metrics(self, node, name, value, unit):
         metric = {"node": node, "name": name, "value": value}
@@ -44,6 +44,10 @@ def from_iso8601(ts):
     :param ts: an ISO-8601 compliant string
     :return: The corresponding datetime instance.
     """
+    # Fast path for the fixed-width format written by ``to_iso8601``; strptime is comparatively expensive and this is called
+    # for every race file when listing races.
+    if len(ts) == 16 and ts[8] == "T" and ts[15] == "Z" and ts[:8].isdigit() and ts[9:15].isdigit():
+        return datetime(int(ts[0:4]), int(ts[4:6]), int(ts[6:8]), int(ts[9:11]), int(ts[11:13]), int(ts[13:15]))
     return datetime.strptime(ts, "%Y%m%dT%H%M%SZ")
 
 
@@ -42,13 +42,14 @@ def get_doc_outpath(outdir, name, suffix=""):
     return os.path.join(outdir, f"{name}-documents{suffix}.json")
 
 
-def extract(client, output_path, index, batch_size=1000):
+def extract(client, output_path, index, batch_size=1000, show_progress=True):
     """
     Scroll an index with a match-all query, dumping document source to ``outdir/documents.json``.
 
     :param client: Elasticsearch client used to extract data
     :param output_path: Destination directory for corpus dump
     :param index: Name of index to dump
+    :param show_progress: Whether to show the extraction progress of this index on the console
     :return: dict of properties describing the corpus for templates
     """
 
@@ -58,22 +59,30 @@ def extract(client, output_path, index, batch_size=1000):
     if total_docs > 0:
         logger.info("[%d] total docs in index [%s].", total_docs, index)
         docs_path = get_doc_outpath(output_path, index)
-        dump_documents(client, index, get_doc_outpath(output_path, index, "-1k"), min(total_docs, 1000), batch_size, " for test mode")
-        dump_documents(client, index, docs_path, total_docs, batch_size)
+        dump_documents(
+            client,
+            index,
+            get_doc_outpath(output_path, index, "-1k"),
+            min(total_docs, 1000),
+            batch_size,
+            " for test mode",
+            show_progress=show_progress,
+        )
+        dump_documents(client, index, docs_path, total_docs, batch_size, show_progress=show_progress)
         return template_vars(index, docs_path, total_docs)
     else:
         logger.info("Skipping corpus extraction fo index [%s] as it contains no documents.", index)
         return None
 
 
-def dump_documents(client, index, out_path, total_docs, batch_size=1000, progress_message_suffix=""):
+def dump_documents(client, index, out_path, total_docs, batch_size=1000, progress_message_suffix="", show_progress=True):
     # pylint: disable=import-outside-toplevel
     from elasticsearch import helpers
 
     logger = logging.getLogger(__name__)
     freq = max(1, total_docs // batch_size)
 
-    progress = console.progress()
+    progress = console.progress() if show_progress else None
     compressor = DOCS_COMPRESSOR()
     comp_outpath = out_path + COMP_EXT
     with open(out_path, "wb") as outfile:
@@ -88,10 +97,12 @@ def dump_documents(client, index, out_path, total_docs, batch_size=1000, progres
                 outfile.write(data)
                 comp_outfile.write(compressor.compress(data))
 
-                render_progress(progress, progress_message_suffix, index, n + 1, total_docs, freq)
+                if progress:
+                    render_progress(progress, progress_message_suffix, index, n + 1, total_docs, freq)
 
             comp_outfile.write(compressor.flush())
-    progress.finish()
+    if progress:
+        progress.finish()
 
 
 def render_progress(progress, progress_message_suffix, index, cur, total, freq):
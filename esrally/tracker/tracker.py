@@ -15,6 +15,8 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import concurrent.futures
+import functools
 import logging
 import os
 
@@ -26,13 +28,21 @@ from esrally.client import factory
 from esrally.tracker import corpus, index
 from esrally.utils import console, io
 
+# corpus extraction is bound by network and disk I/O so we extract several indices concurrently
+MAX_CORPUS_EXTRACTION_THREADS = 8
+
+
+@functools.cache
+def _template_env(templates_path):
+    # templates are rendered several times per track so we reuse the environment (and thus its template cache)
+    return Environment(loader=FileSystemLoader(templates_path))
+
 
 def process_template(templates_path, template_filename, template_vars, output_path):
-    env = Environment(loader=FileSystemLoader(templates_path))
-    template = env.get_template(template_filename)
+    template = _template_env(templates_path).get_template(template_filename)
 
     with open(output_path, "w") as f:
-        f.write(template.render(template_vars))
+        template.stream(template_vars).dump(f)
 
 
 def extract_indices_from_data_streams(client, data_streams_to_extract):
@@ -60,10 +70,25 @@ def extract_mappings_and_corpora(client, output_path, indices_to_extract, batch_
             logging.getLogger(__name__).exception("Failed to extract index [%s]", index_name)
 
     # That list only contains valid indices (with index patterns already resolved)
-    for i in indices:
-        c = corpus.extract(client, output_path, i["name"], batch_size)
-        if c:
-            corpora.append(c)
+    if indices:
+        # the progress lines of several indices would overwrite each other so we only report how many indices are done
+        parallel = len(indices) > 1
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(indices), MAX_CORPUS_EXTRACTION_THREADS)) as pool:
+            extracted = [
+                pool.submit(corpus.extract, client, output_path, i["name"], batch_size, show_progress=not parallel) for i in indices
+            ]
+            if parallel:
+                progress = console.progress()
+                msg = f"Extracting documents for [{len(indices)}] indices..."
+                progress.print(msg, f"0/{len(indices)} indices done")
+                for done, _ in enumerate(concurrent.futures.as_completed(extracted), start=1):
+                    progress.print(msg, f"{done}/{len(indices)} indices done")
+                progress.finish()
+            # keep the order of indices so the generated track is deterministic
+            for f in extracted:
+                c = f.result()
+                if c:
+                    corpora.append(c)
 
     return indices, corpora
 
@@ -67,7 +67,13 @@ Key = Literal[
     "config.version",
     "data_streams",
     "datastore.api_key",
+    "datastore.buffer.max_docs",
+    "datastore.bulk.chunk_size",
+    "datastore.bulk.max_chunk_bytes",
+    "datastore.bulk.queue_size",
+    "datastore.bulk.thread_count",
     "datastore.host",
+    "datastore.http_compress",
     "datastore.number_of_replicas",
     "datastore.number_of_shards",
     "datastore.overwrite_existing_templates",
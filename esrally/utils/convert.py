@@ -202,7 +202,10 @@ def duration(x: int | float, unit: Duration.Unit = Duration.Unit.S) -> Duration:
 def seconds_to_ms(x: int | float | None) -> float | None:
     if x is None:
         return None
-    return duration(x, Duration.Unit.S).ms()
+    if isinstance(x, Duration):
+        return x.ms()
+    # Equivalent to duration(x, Duration.Unit.S).ms() but this is called for every metrics record, so avoid creating a Duration.
+    return int(x * Duration.Unit.S) / Duration.Unit.MS
 
 
 def ms_to_seconds(x: int | float | None) -> float | None:
@@ -21,11 +21,15 @@ import datetime
 import json
 import logging
 import os
+import pickle
 import random
 import socket
+import statistics
 import sys
 import tempfile
+import threading
 import uuid
+import zlib
 from dataclasses import dataclass
 from unittest import mock
 
@@ -38,7 +42,7 @@ from elastic_transport import NodeConfig
 from esrally import client, config, exceptions, metrics, paths, time, track
 from esrally.metrics import GlobalStatsCalculator
 from esrally.track import Challenge, Operation, Task, Track
-from esrally.utils import cases, opts
+from esrally.utils import cases, io, opts
 
 
 def rally_metric_template():
@@ -133,6 +137,22 @@ class TestTrackParamsForReporting:
         }
 
 
+class TestMetricsStoreClass:
+    @pytest.mark.parametrize(
+        "datastore_type, expected_class",
+        [
+            ("elasticsearch", metrics.EsMetricsStore),
+            ("in-memory", metrics.InMemoryMetricsStore),
+            ("unknown", metrics.InMemoryMetricsStore),
+        ],
+    )
+    def test_selects_class_by_datastore_type(self, datastore_type, expected_class):
+        cfg = config.Config()
+        cfg.add(config.Scope.application, "reporting", "datastore.type", datastore_type)
+
+        assert metrics.metrics_store_class(cfg) is expected_class
+
+
 class TestEsClient:
     class NodeMock:
         def __init__(self, host, port):
@@ -166,6 +186,7 @@ class TestEsClient:
     @pytest.mark.parametrize("password_configuration", [None, "config", "environment"])
     def test_config_opts_parsing_basic(self, password_configuration, monkeypatch):
         cfg = config.Config()
+        monkeypatch.setattr(metrics, "_json_serializer", lambda: None)
 
         _datastore_host = "rally-metrics-123abc.es.us-east-1.aws.elastic.cloud"
         _datastore_port = 443
@@ -204,11 +225,12 @@ class TestEsClient:
 
         expected_client_options = {
             "use_ssl": True,
-            "timeout": 120,
+            "request_timeout": 120,
             "basic_auth_user": _datastore_user,
             "basic_auth_password": _datastore_password,
             "verify_certs": _datastore_verify_certs,
             "node_class": metrics.KeepaliveUrllib3HttpNode,
+            "connections_per_node": 10,
         }
 
         client_factory.assert_called_with(
@@ -221,6 +243,7 @@ class TestEsClient:
     @pytest.mark.parametrize("apikey_configuration", ["config", "environment"])
     def test_config_opts_parsing_apikey(self, apikey_configuration, monkeypatch):
         cfg = config.Config()
+        monkeypatch.setattr(metrics, "_json_serializer", lambda: None)
 
         _datastore_host = "rally-metrics-123abc.es.us-east-1.aws.elastic.cloud"
         _datastore_port = 443
@@ -256,10 +279,11 @@ class TestEsClient:
 
         expected_client_options = {
             "use_ssl": True,
-            "timeout": 120,
+            "request_timeout": 120,
             "verify_certs": _datastore_verify_certs,
             "api_key": _datastore_apikey,
             "node_class": metrics.KeepaliveUrllib3HttpNode,
+            "connections_per_node": 10,
         }
 
         client_factory.assert_called_with(
@@ -271,6 +295,7 @@ class TestEsClient:
 
     def test_config_opts_parsing_both_password_apikey(self, monkeypatch):
         cfg = config.Config()
+        monkeypatch.setattr(metrics, "_json_serializer", lambda: None)
 
         _datastore_host = "rally-metrics-123abc.es.us-east-1.aws.elastic.cloud"
         _datastore_port = 443
@@ -306,7 +331,7 @@ class TestEsClient:
 
         expected_client_options = {
             "use_ssl": True,
-            "timeout": 120,
+            "request_timeout": 120,
             "verify_certs": _datastore_verify_certs,
             "api_key": _datastore_apikey,
         }
@@ -318,7 +343,39 @@ class TestEsClient:
             distribution_flavor=None,
         )
 
-    @mock.patch("random.random")
+    def test_config_opts_uses_faster_json_serializer_if_available(self, monkeypatch):
+        json_serializer = object()
+        monkeypatch.setattr(metrics, "_json_serializer", lambda: json_serializer)
+        cfg = config.Config()
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.host", "localhost")
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.port", 9200)
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.secure", False)
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.probe.cluster_version", False)
+
+        client_factory = mock.create_autospec(client.EsClientFactory)
+        metrics.EsClientFactory(cfg, client_factory=client_factory)
+
+        _, kwargs = client_factory.call_args
+        assert kwargs["client_options"]["serializer"] is json_serializer
+
+    def test_config_opts_http_compress_and_connections(self, monkeypatch):
+        monkeypatch.setattr(metrics, "_json_serializer", lambda: None)
+        cfg = config.Config()
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.host", "localhost")
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.port", 9200)
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.secure", False)
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.probe.cluster_version", False)
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.http_compress", "true")
+        cfg.add(config.Scope.applicationOverride, "reporting", "datastore.bulk.thread_count", 16)
+
+        client_factory = mock.create_autospec(client.EsClientFactory)
+        metrics.EsClientFactory(cfg, client_factory=client_factory)
+
+        _, kwargs = client_factory.call_args
+        assert kwargs["client_options"]["http_compress"] is True
+        assert kwargs["client_options"]["connections_per_node"] == 16
+
+    @mock.patch("random.Random.random")
     @mock.patch("esrally.time.sleep")
     def test_retries_on_various_errors(self, mocked_sleep, mocked_random, caplog):
         class ConnectionError:
@@ -575,7 +632,7 @@ class TestEsClient:
         ):
             client.guarded(raise_bulk_index_error)
 
-    @mock.patch("random.random")
+    @mock.patch("random.Random.random")
     @mock.patch("esrally.time.sleep")
     def test_bulk_index_error_retryable_via_create_key(self, mocked_sleep, mocked_random):
         # When data streams are in use, Elasticsearch structures bulk errors under "create",
@@ -629,6 +686,118 @@ class TestEsClient:
         ):
             client.guarded(raise_bulk_index_error)
 
+    @mock.patch("elasticsearch.helpers.parallel_bulk")
+    def test_bulk_index_drains_parallel_bulk(self, parallel_bulk):
+        consumed = []
+
+        def bulk_results(client, actions, expand_action_callback, **kwargs):
+            for action in actions:
+                consumed.append(expand_action_callback(action))
+                yield True, {}
+
+        parallel_bulk.side_effect = bulk_results
+        es = self.ClientMock([{"host": "127.0.0.1", "port": "9243"}])
+        client = metrics.EsClient(es, bulk_thread_count=2, bulk_queue_size=8, bulk_chunk_size=500, bulk_max_chunk_bytes=1024)
+
+        items = [{"name": "service_time"}, {"name": "latency"}]
+        client.bulk_index(index="rally-metrics-v1", items=items, use_data_streams=True)
+
+        parallel_bulk.assert_called_once_with(
+            es,
+            mock.ANY,
+            raise_on_error=False,
+            raise_on_exception=False,
+            index="rally-metrics-v1",
+            expand_action_callback=mock.ANY,
+            chunk_size=500,
+            max_chunk_bytes=1024,
+            thread_count=2,
+            queue_size=8,
+        )
+        assert consumed == [
+            ({"create": {}}, {"name": "service_time"}),
+            ({"create": {}}, {"name": "latency"}),
+        ]
+        # documents must not be modified
+        assert items == [{"name": "service_time"}, {"name": "latency"}]
+
+    @mock.patch("random.Random.random", return_value=0)
+    @mock.patch("esrally.time.sleep")
+    @mock.patch("elasticsearch.helpers.parallel_bulk")
+    def test_bulk_index_retries_only_failed_docs(self, parallel_bulk, mocked_sleep, mocked_random):
+        sent = []
+        rejected = {"create": {"_index": "rally-metrics-v1", "status": 429, "error": {"type": "es_rejected_execution_exception"}}}
+
+        def bulk_results(client, actions, **kwargs):
+            attempt = []
+            sent.append(attempt)
+            for doc in actions:
+                attempt.append(doc["name"])
+                # reject the second document once
+                if doc["name"] == "latency" and len(sent) == 1:
+                    yield False, rejected
+                else:
+                    yield True, {}
+
+        parallel_bulk.side_effect = bulk_results
+        client = metrics.EsClient(self.ClientMock([{"host": "127.0.0.1", "port": "9243"}]))
+
+        client.bulk_index(
+            index="rally-metrics-v1",
+            items=[{"name": "service_time"}, {"name": "latency"}, {"name": "throughput"}],
+            use_data_streams=True,
+        )
+
+        assert sent == [["service_time", "latency", "throughput"], ["latency"]]
+        mocked_sleep.assert_called_once()
+
+    @mock.patch("random.Random.random", return_value=0)
+    @mock.patch("esrally.time.sleep")
+    @mock.patch("elasticsearch.helpers.parallel_bulk")
+    def test_bulk_index_resends_unacknowledged_docs_after_connection_error(self, parallel_bulk, mocked_sleep, mocked_random):
+        sent = []
+
+        def bulk_results(client, actions, **kwargs):
+            attempt = []
+            sent.append(attempt)
+            for doc in actions:
+                attempt.append(doc["name"])
+                if doc["name"] == "latency" and len(sent) == 1:
+                    raise elasticsearch.exceptions.ConnectionError("unit-test")
+                yield True, {}
+
+        parallel_bulk.side_effect = bulk_results
+        client = metrics.EsClient(self.ClientMock([{"host": "127.0.0.1", "port": "9243"}]))
+
+        client.bulk_index(
+            index="rally-metrics-v1",
+            items=(doc for doc in [{"name": "service_time"}, {"name": "latency"}, {"name": "throughput"}]),
+            use_data_streams=True,
+        )
+
+        # the acknowledged document is not sent again
+        assert sent == [["service_time", "latency"], ["latency", "throughput"]]
+        mocked_sleep.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "use_data_streams, doc_id, expected_kwargs",
+        [
+            (False, None, {"id": None}),
+            (False, "abc", {"id": "abc"}),
+            (True, "abc", {"op_type": "create"}),
+        ],
+    )
+    @mock.patch("elasticsearch.helpers.parallel_bulk")
+    def test_index_single_doc(self, parallel_bulk, use_data_streams, doc_id, expected_kwargs):
+        es = self.ClientMock([{"host": "127.0.0.1", "port": "9243"}])
+        es.index = mock.Mock()
+        client = metrics.EsClient(es)
+
+        client.index(index="rally-races-v1", item={"race-id": "abc"}, id=doc_id, use_data_streams=use_data_streams)
+
+        es.index.assert_called_once_with(index="rally-races-v1", document={"race-id": "abc"}, **expected_kwargs)
+        parallel_bulk.assert_not_called()
+
 
 class TestKeepaliveUrllib3HttpNode:
     """Tests for the TCP keepalive node subclass."""
@@ -792,6 +961,14 @@ class TestIndexTemplateProvider:
             assert t["index_patterns"] == [f"{es_store_type.index_prefix}*"]
             assert t["template"]["mappings"]["properties"]["@timestamp"] == {"type": "date", "format": "epoch_millis"}
 
+    def test_settings_of_one_provider_do_not_leak_into_another(self):
+        customized = json.loads(self._make_provider(number_of_shards=3).get_template(metrics.EsStoreType.metrics))
+        assert customized["template"]["settings"]["index"]["number_of_shards"] == 3
+
+        self.setup_method(None)
+        default = json.loads(self._make_provider().get_template(metrics.EsStoreType.metrics))
+        assert "number_of_shards" not in default["template"]["settings"]["index"]
+
 
 class TestComponentTemplateProvider:
     def setup_method(self, method):
@@ -931,6 +1108,16 @@ class TestIndexHandler:
             assert handler.index_name(self.RACE_TIMESTAMP) == f"{case.es_store_type.index_prefix}2016-01"
             assert handler.index_name(time.to_iso8601(self.RACE_TIMESTAMP)) == f"{case.es_store_type.index_prefix}2016-01"
 
+    @mock.patch("esrally.time.from_iso8601", wraps=time.from_iso8601)
+    def test_index_name_is_resolved_once_per_race_timestamp(self, from_iso8601):
+        self.cfg.add(config.Scope.application, "reporting", "datastore.use_data_streams", False)
+        handler = metrics.IndexHandler(self.cfg, self.client, metrics.EsStoreType.metrics)
+
+        for _ in range(3):
+            assert handler.index_name("20160131T000000Z") == "rally-metrics-2016-01"
+        assert handler.index_name("20160229T000000Z") == "rally-metrics-2016-02"
+        assert from_iso8601.call_count == 2
+
     @dataclass
     class ShouldApplyUpdateCase:
         old_resource: object | None = None
@@ -1678,6 +1865,123 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
 
         assert actual_index_size == index_size
 
+    def test_query_filters_are_reused_per_race(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+        first = self.metrics_store._query_by_name("service_time", "index-append", None, metrics.SampleType.Normal, None)
+        second = self.metrics_store._query_by_name("service_time", "index-append", None, metrics.SampleType.Normal, None)
+
+        assert first == second
+        assert first["bool"]["filter"] is not second["bool"]["filter"]
+        assert first["bool"]["filter"][2] is second["bool"]["filter"][2]
+
+        self.metrics_store.open("other-race-id", self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+        other = self.metrics_store._query_by_name("service_time", "index-append", None, metrics.SampleType.Normal, None)
+
+        assert other["bool"]["filter"][0] == {"term": {"race-id": "other-race-id"}}
+
+    def test_get_values(self):
+        search_result = {
+            "hits": {
+                "total": {"value": 2, "relation": "eq"},
+                "hits": [{"_source": {"value": 10}}, {"_source": {"value": 20}}],
+            },
+        }
+        self.es_mock.search = mock.MagicMock(return_value=search_result)
+        self.es_mock.open_point_in_time = mock.MagicMock(return_value="pit-1")
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        assert self.metrics_store.get("service_time", task="index-append") == [10, 20]
+        # a single page is enough
+        self.es_mock.search.assert_called_once()
+        self.es_mock.close_point_in_time.assert_called_once_with("pit-1")
+
+    def test_get_by_name(self):
+        search_result = {
+            "hits": {
+                "total": {"value": 3, "relation": "eq"},
+                "hits": [
+                    {"_source": {"name": "flush_total_time", "value": 10}},
+                    {"_source": {"name": "merges_total_time", "value": 20}},
+                    {"_source": {"name": "flush_total_time", "value": 30}},
+                ],
+            },
+        }
+        self.es_mock.search = mock.MagicMock(return_value=search_result)
+        self.es_mock.open_point_in_time = mock.MagicMock(return_value="pit-1")
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        values = self.metrics_store.get_by_name(["flush_total_time", "merges_total_time", "refresh_total_time"])
+
+        assert values == {"flush_total_time": [10, 30], "merges_total_time": [20], "refresh_total_time": []}
+        self.es_mock.open_point_in_time.assert_called_once_with(
+            index=f"{metrics.EsStoreType.metrics.index_prefix}{metrics.EsStoreType.metrics.data_stream_version}", keep_alive="1m"
+        )
+        self.es_mock.search.assert_called_once_with(
+            index=None,
+            body={
+                "query": {
+                    "bool": {
+                        "filter": [
+                            {"term": {"race-id": self.RACE_ID}},
+                            {"terms": {"name": ["flush_total_time", "merges_total_time", "refresh_total_time"]}},
+                        ]
+                    }
+                },
+                "size": 10000,
+                "track_total_hits": False,
+                "sort": ["_shard_doc"],
+                "pit": {"id": "pit-1", "keep_alive": "1m"},
+            },
+        )
+
+    def test_get_raw_by_name(self):
+        disk_usage = {"name": "disk_usage_total", "value": 1024, "unit": "byte", "meta": {"index": "logs", "field": "message"}}
+        ml_processing_time = {"name": "ml_processing_time", "job": "job-1", "min": 1, "mean": 2, "median": 2, "max": 3, "unit": "ms"}
+        search_result = {
+            "hits": {
+                "total": {"value": 2, "relation": "eq"},
+                "hits": [{"_source": disk_usage}, {"_source": ml_processing_time}],
+            },
+        }
+        self.es_mock.search = mock.MagicMock(return_value=search_result)
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        docs = self.metrics_store.get_raw_by_name(["disk_usage_total", "ml_processing_time", "disk_usage_norms"])
+
+        assert docs == {"disk_usage_total": [disk_usage], "ml_processing_time": [ml_processing_time], "disk_usage_norms": []}
+        self.es_mock.search.assert_called_once()
+
+    def test_get_pages_through_all_results(self):
+        index = f"{metrics.EsStoreType.metrics.index_prefix}{metrics.EsStoreType.metrics.data_stream_version}"
+        self.metrics_store._GET_PAGE_SIZE = 2
+        self.es_mock.open_point_in_time = mock.MagicMock(return_value="pit-1")
+        self.es_mock.search = mock.MagicMock(
+            side_effect=[
+                {
+                    "pit_id": "pit-2",
+                    "hits": {"hits": [{"_source": {"value": 10}, "sort": [0]}, {"_source": {"value": 20}, "sort": [1]}]},
+                },
+                {
+                    "pit_id": "pit-2",
+                    "hits": {"hits": [{"_source": {"value": 30}, "sort": [2]}]},
+                },
+            ]
+        )
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        assert self.metrics_store.get("service_time") == [10, 20, 30]
+        self.es_mock.open_point_in_time.assert_called_once_with(index=index, keep_alive="1m")
+        # every page is fetched once
+        assert self.es_mock.search.call_count == 2
+        last_query = self.es_mock.search.call_args.kwargs["body"]
+        assert last_query["pit"] == {"id": "pit-2", "keep_alive": "1m"}
+        assert last_query["search_after"] == [1]
+        self.es_mock.close_point_in_time.assert_called_once_with("pit-2")
+
     def test_get_mean(self):
         mean_throughput = 1734
         search_result = {
@@ -1709,6 +2013,7 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
                 }
             },
             "size": 0,
+            "track_total_hits": False,
             "aggs": {
                 "metric_stats": {
                     "stats": {
@@ -1726,6 +2031,51 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
 
         assert actual_mean_throughput == mean_throughput
 
+    def test_get_percentiles_without_matching_docs(self):
+        search_result = {
+            "hits": {"hits": []},
+            "aggregations": {"percentile_stats": {"values": {"50.0": None, "99.0": None}}},
+        }
+        self.es_mock.search = mock.MagicMock(return_value=search_result)
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        assert self.metrics_store.get_percentiles("service_time", task="index-append", percentiles=[50, 99]) is None
+
+    def test_get_stats_is_cached_until_flush(self):
+        stats = {"count": 17, "min": 1208, "max": 1839, "avg": 1734, "sum": 28934}
+        self.es_mock.search = mock.MagicMock(return_value={"hits": {"total": 17}, "aggregations": {"metric_stats": stats}})
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        assert self.metrics_store.get_stats("indexing_throughput", operation_type="bulk") == stats
+        # callers may modify the returned stats
+        self.metrics_store.get_stats("indexing_throughput", operation_type="bulk")["avg"] = 0
+        assert self.metrics_store.get_stats("indexing_throughput", operation_type="bulk") == stats
+        assert self.es_mock.search.call_count == 1
+
+        self.metrics_store.get_stats("indexing_throughput", operation_type="index")
+        assert self.es_mock.search.call_count == 2
+
+        self.metrics_store.flush()
+        self.metrics_store.get_stats("indexing_throughput", operation_type="bulk")
+        assert self.es_mock.search.call_count == 3
+
+    def test_get_stats_during_flush_is_not_cached(self):
+        stats = {"count": 17, "min": 1208, "max": 1839, "avg": 1734, "sum": 28934}
+        self.es_mock.search = mock.MagicMock(return_value={"hits": {"total": 17}, "aggregations": {"metric_stats": stats}})
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+        self.metrics_store.put_value_cluster_level("indexing_throughput", 1000, "docs/s", operation_type="bulk")
+        # simulates a query from another thread that runs before the flushed docs are searchable
+        self.es_mock.refresh.side_effect = lambda **kwargs: self.metrics_store.get_stats("indexing_throughput", operation_type="bulk")
+
+        self.metrics_store.flush()
+        assert self.es_mock.search.call_count == 1
+
+        self.metrics_store.get_stats("indexing_throughput", operation_type="bulk")
+        assert self.es_mock.search.call_count == 2
+
     def test_get_median(self):
         median_throughput = 30535
         search_result = {
@@ -1755,6 +2105,7 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
                 }
             },
             "size": 0,
+            "track_total_hits": False,
             "aggs": {
                 "percentile_stats": {
                     "percentiles": {
@@ -1773,6 +2124,67 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
 
         assert actual_median_throughput == median_throughput
 
+    def test_get_summary(self):
+        search_result = {
+            "hits": {"hits": []},
+            "aggregations": {
+                "metric_stats": {"count": 3, "min": 1208, "max": 1839, "avg": 1500, "sum": 4500},
+                "percentile_stats": {"values": {"50.0": 1453}},
+            },
+        }
+        self.es_mock.search = mock.MagicMock(return_value=search_result)
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        expected_query = {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"term": {"race-id": self.RACE_ID}},
+                        {"term": {"name": "throughput"}},
+                        {"term": {"task": "index-append"}},
+                        {"term": {"sample-type": "normal"}},
+                    ]
+                }
+            },
+            "size": 0,
+            "track_total_hits": False,
+            "aggs": {
+                "metric_stats": {
+                    "stats": {
+                        "field": "value",
+                    },
+                },
+                "percentile_stats": {
+                    "percentiles": {
+                        "field": "value",
+                        "percents": ["50.0"],
+                    },
+                },
+            },
+        }
+
+        summary = self.metrics_store.get_summary("throughput", task="index-append", sample_type=metrics.SampleType.Normal)
+
+        self.es_mock.search.assert_called_once_with(
+            index=f"{metrics.EsStoreType.metrics.index_prefix}{metrics.EsStoreType.metrics.data_stream_version}", body=expected_query
+        )
+        assert summary == {"count": 3, "min": 1208, "max": 1839, "avg": 1500, "sum": 4500, "median": 1453}
+
+    def test_get_summary_without_matching_docs(self):
+        search_result = {
+            "hits": {"hits": []},
+            "aggregations": {
+                "metric_stats": {"count": 0, "min": None, "max": None, "avg": None, "sum": 0.0},
+                "percentile_stats": {"values": {"50.0": None}},
+            },
+        }
+        self.es_mock.search = mock.MagicMock(return_value=search_result)
+
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults")
+
+        assert self.metrics_store.get_summary("throughput", task="index-append") is None
+
     def test_get_error_rate_implicit_zero(self):
         assert (
             self._get_error_rate(
@@ -1921,8 +2333,8 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
 
     def test_flush_snapshots_docs_before_bulk_index(self):
         # flush() must snapshot and reset self._docs before calling bulk_index so that
-        # docs added concurrently by background sampler threads land in the next flush,
-        # not in the current one where they would be sent without _op_type="create".
+        # docs added concurrently by background sampler threads land in the next flush
+        # and are not lost.
         ms, es_mock = self._make_metrics_store(use_data_streams=True)
         ms.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append", "defaults", create=True)
 
@@ -1954,6 +2366,117 @@ class TestEsMetricsStore:  # pylint: disable=too-many-public-methods
             use_data_streams=True,
         )
 
+    def test_add_flushes_full_buffer_in_background(self):
+        self.cfg.add(config.Scope.application, "reporting", "datastore.buffer.max_docs", 2)
+        ms, es_mock = self._make_metrics_store(use_data_streams=False)
+        ms.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append", "defaults", create=True)
+        flushed = threading.Event()
+        es_mock.bulk_index.side_effect = lambda **kwargs: flushed.set()
+
+        ms._add({"name": "first"})
+        assert ms._flusher is None
+
+        ms._add({"name": "second"})
+        assert flushed.wait(timeout=5)
+        ms._stop_flusher()
+        es_mock.bulk_index.assert_called_once_with(
+            index=ms._index_handler.index_name(self.RACE_TIMESTAMP),
+            items=[{"name": "first"}, {"name": "second"}],
+            use_data_streams=False,
+        )
+        assert ms._docs == []
+
+    @staticmethod
+    def _wait_for_failed_background_flush(ms, failed):
+        assert failed.wait(timeout=5)
+        # the docs are re-queued after the client has raised
+        for _ in range(500):
+            with ms._docs_lock:
+                if ms._docs:
+                    return
+            threading.Event().wait(0.01)
+        pytest.fail("failed docs have not been re-queued")
+
+    def _fail_background_flush(self, es_mock):
+        failed = threading.Event()
+
+        def bulk_index(**kwargs):
+            failed.set()
+            raise exceptions.RallyError("connection failed")
+
+        es_mock.bulk_index.side_effect = bulk_index
+        return failed
+
+    def test_failed_background_flush_is_left_to_regular_flush_cycle(self):
+        self.cfg.add(config.Scope.application, "reporting", "datastore.buffer.max_docs", 1)
+        ms, es_mock = self._make_metrics_store(use_data_streams=False)
+        ms.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append", "defaults", create=True)
+        failed = self._fail_background_flush(es_mock)
+
+        ms._add({"name": "first"})
+        self._wait_for_failed_background_flush(ms, failed)
+        ms._add({"name": "second"})
+
+        # the failure neither counts towards the limit of the regular flush cycle nor triggers another background flush
+        es_mock.bulk_index.assert_called_once()
+        assert ms._flush_consecutive_failures == 0
+        assert ms._docs == [{"name": "first"}, {"name": "second"}]
+
+        es_mock.bulk_index.side_effect = None
+        ms.flush(refresh=False)
+        es_mock.bulk_index.assert_called_with(
+            index=ms._index_handler.index_name(self.RACE_TIMESTAMP),
+            items=[{"name": "first"}, {"name": "second"}],
+            use_data_streams=False,
+        )
+        assert not ms._buffer_flush_failed
+        ms._stop_flusher()
+
+    def test_closing_flush_does_not_flush_in_background(self):
+        self.cfg.add(config.Scope.application, "reporting", "datastore.buffer.max_docs", 1)
+        ms, es_mock = self._make_metrics_store(use_data_streams=False)
+        ms.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append", "defaults", create=True)
+        failed = self._fail_background_flush(es_mock)
+        ms._add({"name": "first"})
+        self._wait_for_failed_background_flush(ms, failed)
+        flusher = ms._flusher
+        es_mock.bulk_index.side_effect = None
+
+        ms.flush(closing=True)
+
+        assert not flusher.is_alive()
+        # only the failed background flush and the closing flush
+        assert es_mock.bulk_index.call_count == 2
+        es_mock.bulk_index.assert_called_with(
+            index=ms._index_handler.index_name(self.RACE_TIMESTAMP),
+            items=[{"name": "first"}],
+            use_data_streams=False,
+        )
+
+    def test_add_does_not_start_flusher_while_stopping(self):
+        self.cfg.add(config.Scope.application, "reporting", "datastore.buffer.max_docs", 1)
+        ms, es_mock = self._make_metrics_store(use_data_streams=False)
+        ms.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append", "defaults", create=True)
+        ms._add({"name": "first"})
+        flusher = ms._flusher
+
+        ms._stop_flusher()
+        ms._add({"name": "second"})
+
+        assert not flusher.is_alive()
+        assert ms._flusher is None
+
+    def test_add_never_flushes_if_max_docs_disabled(self):
+        self.cfg.add(config.Scope.application, "reporting", "datastore.buffer.max_docs", 0)
+        ms, es_mock = self._make_metrics_store(use_data_streams=False)
+        ms.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append", "defaults", create=True)
+
+        for i in range(100):
+            ms._add({"name": f"doc-{i}"})
+
+        assert ms._flusher is None
+        es_mock.bulk_index.assert_not_called()
+
     # ------------------------------------------------------------------ #
     #  flush() error-path tests                                           #
     # ------------------------------------------------------------------ #
@@ -2381,6 +2904,8 @@ class TestEsRaceStore:
         )
         # index should still have been called only once (from the first store_race)
         es_mock.index.assert_called_once()
+        # the index template is only checked before the race is stored for the first time
+        rs._index_handler.ensure_index_template.assert_called_once_with(create=True)
 
     def test_store_race_redacts_secret_prefixed_track_param_values(self):
         schedule = [track.Task("index #1", track.Operation("index", track.OperationType.Bulk))]
@@ -2433,6 +2958,24 @@ class TestEsRaceStore:
         self.es_mock.delete_by_query.assert_any_call(index="rally-results-*", body=expected_query)
         console.assert_called_with("Did not find [0101] in environment [unittest-env].")
 
+    @mock.patch("esrally.utils.console.println")
+    def test_delete_multiple_races(self, console):
+        self.es_mock.search.return_value = {"aggregations": {"races": {"buckets": [{"key": "0102", "doc_count": 3}]}}}
+        self.es_mock.delete_by_query.return_value = {"deleted": 3}
+        self.cfg.add(config.Scope.application, "system", "delete.id", "0101,0102")
+        self.race_store.delete_race()
+        expected_query = {
+            "query": {"bool": {"filter": [{"term": {"environment": "unittest-env"}}, {"terms": {"race-id": ["0101", "0102"]}}]}}
+        }
+        assert self.es_mock.delete_by_query.call_count == 3
+        self.es_mock.delete_by_query.assert_any_call(index="rally-races-*", body=expected_query)
+        self.es_mock.delete_by_query.assert_any_call(index="rally-metrics-*", body=expected_query)
+        self.es_mock.delete_by_query.assert_any_call(index="rally-results-*", body=expected_query)
+        assert console.call_args_list == [
+            mock.call("Did not find [0101] in environment [unittest-env]."),
+            mock.call("Successfully deleted [0102] in environment [unittest-env]."),
+        ]
+
     @mock.patch("esrally.utils.console.println")
     def test_delete_annotation(self, console):
         self.es_mock.delete.return_value = {"result": "deleted"}
@@ -2529,6 +3072,34 @@ class TestEsRaceStore:
         }
         self.es_mock.search.assert_called_with(index="rally-races-*", body=expected_query)
 
+    def test_list_races_in_pages(self):
+        def hit(race_id):
+            source = {
+                "rally-version": "0.4.4",
+                "environment": "unittest-env",
+                "race-id": race_id,
+                "race-timestamp": "20160131T000000Z",
+                "pipeline": "from-sources",
+                "track": "unittest",
+                "car": "defaults",
+            }
+            return {"_source": source, "sort": [1454198400000, race_id]}
+
+        self.race_store._LIST_PAGE_SIZE = 2
+        self.cfg.add(config.Scope.application, "system", "list.max_results", 3)
+        self.es_mock.search.side_effect = [
+            {"hits": {"total": {"value": 4, "relation": "eq"}, "hits": [hit("1"), hit("2")]}},
+            {"hits": {"total": {"value": 4, "relation": "eq"}, "hits": [hit("3")]}},
+        ]
+
+        races = self.race_store.list()
+
+        assert [r.race_id for r in races] == ["1", "2", "3"]
+        last_query = self.es_mock.search.call_args.kwargs["body"]
+        assert last_query["sort"] == [{"race-timestamp": {"order": "desc"}}, {"race-id": {"order": "asc"}}]
+        assert last_query["search_after"] == [1454198400000, "2"]
+        assert last_query["size"] == 1
+
 
 class TestEsResultsStore:
     RACE_TIMESTAMP = datetime.datetime(2016, 1, 31)
@@ -2713,7 +3284,8 @@ class TestEsResultsStore:
             },
         ]
         expected_index = rs._index_handler.index_name(self.RACE_TIMESTAMP)
-        es_mock.bulk_index.assert_called_with(index=expected_index, items=expected_docs, use_data_streams=use_data_streams)
+        es_mock.bulk_index.assert_called_with(index=expected_index, items=mock.ANY, use_data_streams=use_data_streams)
+        assert list(es_mock.bulk_index.call_args.kwargs["items"]) == expected_docs
         rs._index_handler.ensure_index_template.assert_called_once_with(create=True)
         es_mock.index.assert_not_called()
         es_mock.refresh.assert_not_called()
@@ -2856,7 +3428,8 @@ class TestEsResultsStore:
             },
         ]
         expected_index = rs._index_handler.index_name(self.RACE_TIMESTAMP)
-        es_mock.bulk_index.assert_called_with(index=expected_index, items=expected_docs, use_data_streams=use_data_streams)
+        es_mock.bulk_index.assert_called_with(index=expected_index, items=mock.ANY, use_data_streams=use_data_streams)
+        assert list(es_mock.bulk_index.call_args.kwargs["items"]) == expected_docs
         rs._index_handler.ensure_index_template.assert_called_once_with(create=True)
         es_mock.index.assert_not_called()
         es_mock.refresh.assert_not_called()
@@ -2900,6 +3473,25 @@ class TestInMemoryMetricsStore:
 
         assert duration * 1000 == actual_duration
 
+        first_duration = self.metrics_store.get_one(
+            "service_time", task="task1", mapper=lambda doc: doc["relative-time"], sort_key="relative-time"
+        )
+
+        assert (duration - 400) * 1000 == first_duration
+
+    def test_meta_info_changes_do_not_affect_existing_docs(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults", create=True)
+        self.metrics_store.add_meta_info(metrics.MetaInfoScope.cluster, None, "source_revision", "abc123")
+        self.metrics_store.put_value_node_level("node0", "cpu", 10, "%")
+        self.metrics_store.add_meta_info(metrics.MetaInfoScope.node, "node0", "os_name", "Linux")
+        self.metrics_store.put_value_node_level("node0", "cpu", 20, "%", meta_data={"sample": 2})
+        self.metrics_store.put_value_cluster_level("throughput", 100, "docs/s")
+
+        docs = self.metrics_store.docs
+        assert docs[0]["meta"] == {"source_revision": "abc123"}
+        assert docs[1]["meta"] == {"source_revision": "abc123", "os_name": "Linux", "sample": 2}
+        assert docs[2]["meta"] == {"source_revision": "abc123"}
+
     def test_get_one_no_hits(self):
         duration = StaticClock.NOW
         self.metrics_store.open(
@@ -3002,6 +3594,31 @@ class TestInMemoryMetricsStore:
 
         assert round(abs(500.5 - self.metrics_store.get_median("query_latency")), 7) == 0
 
+    def test_get_summary(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults", create=True)
+        for i in range(1000, 0, -1):
+            self.metrics_store.put_value_cluster_level("query_latency", float(i), "ms")
+
+        assert self.metrics_store.get_summary("query_latency") == {
+            "count": 1000,
+            "min": 1.0,
+            "max": 1000.0,
+            "avg": 500.5,
+            "sum": 500500.0,
+            "median": 500.5,
+        }
+        assert self.metrics_store.get_summary("service_time") is None
+
+    def test_get_stats_avg_of_floats_matches_statistics_mean(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults", create=True)
+        # a naive sum() loses the small values next to the large ones
+        values = [1e16, 1.0, -1e16, 0.1, 0.2, 0.3] * 1000
+        for value in values:
+            self.metrics_store.put_value_cluster_level("query_latency", value, "ms")
+
+        assert self.metrics_store.get_stats("query_latency")["avg"] == statistics.mean(values)
+        assert self.metrics_store.get_summary("query_latency")["avg"] == statistics.mean(values)
+
     def assert_equal_percentiles(self, name, percentiles, expected_percentiles):
         actual_percentiles = self.metrics_store.get_percentiles(name, percentiles=percentiles)
         assert len(expected_percentiles) == len(actual_percentiles)
@@ -3032,6 +3649,28 @@ class TestInMemoryMetricsStore:
         assert len(self.metrics_store.docs) == 1
         assert self.metrics_store.get_one("final_index_size") == 1000
 
+    def test_bulk_add_zlib_compressed_memento(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults", create=True)
+        doc = {"name": "final_index_size", "value": 1000, "unit": "GB", "sample-type": "normal", "meta": {}}
+
+        self.metrics_store.bulk_add(zlib.compress(pickle.dumps([doc])))
+
+        assert self.metrics_store.docs == [doc]
+
+    def test_externalize_with_clear_resets_lookups(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults", create=True)
+        self.metrics_store.put_value_cluster_level("final_index_size", 1000, "GB")
+        self.metrics_store.put_value_cluster_level("segments_count", 7)
+
+        memento = self.metrics_store.to_externalizable(clear=True)
+
+        assert self.metrics_store.docs == []
+        assert self.metrics_store.get_one("final_index_size") is None
+
+        self.metrics_store.bulk_add(memento)
+        assert self.metrics_store.get_one("final_index_size") == 1000
+        assert self.metrics_store.get_one("segments_count") == 7
+
     def test_meta_data_per_document(self):
         self.metrics_store.open(
             self.RACE_ID,
@@ -3122,6 +3761,48 @@ class TestInMemoryMetricsStore:
         assert self.metrics_store.get_error_rate("term-query", sample_type=metrics.SampleType.Normal) == 0.2
 
 
+class TestCompositeRaceStore:
+    def test_store_race_writes_to_all_stores(self):
+        es_store = mock.Mock()
+        file_store = mock.Mock()
+        race = mock.Mock()
+
+        metrics.CompositeRaceStore(es_store, file_store).store_race(race)
+
+        es_store.store_race.assert_called_once_with(race)
+        file_store.store_race.assert_called_once_with(race)
+
+    def test_store_race_propagates_errors(self):
+        es_store = mock.Mock()
+        es_store.store_race.side_effect = exceptions.RallyError("cannot store race")
+        file_store = mock.Mock()
+        race = mock.Mock()
+
+        with pytest.raises(exceptions.RallyError, match="cannot store race"):
+            metrics.CompositeRaceStore(es_store, file_store).store_race(race)
+        file_store.store_race.assert_called_once_with(race)
+
+    def test_store_race_propagates_file_store_errors(self):
+        es_store = mock.Mock()
+        file_store = mock.Mock()
+        file_store.store_race.side_effect = OSError("disk full")
+        race = mock.Mock()
+
+        with pytest.raises(OSError, match="disk full"):
+            metrics.CompositeRaceStore(es_store, file_store).store_race(race)
+        es_store.store_race.assert_called_once_with(race)
+
+    def test_store_race_reports_errors_of_all_stores(self):
+        es_store = mock.Mock()
+        es_store.store_race.side_effect = exceptions.RallyError("cannot store race")
+        file_store = mock.Mock()
+        file_store.store_race.side_effect = OSError("disk full")
+        race = mock.Mock()
+
+        with pytest.raises(exceptions.RallyError, match=r"Elasticsearch race store \[cannot store race\] nor as a file \[disk full\]"):
+            metrics.CompositeRaceStore(es_store, file_store).store_race(race)
+
+
 class TestFileRaceStore:
     RACE_TIMESTAMP = datetime.datetime(2016, 1, 31)
     RACE_ID = "6ebc6e53-ee20-4b0c-99b4-09697987e9f4"
@@ -3255,6 +3936,82 @@ class TestFileRaceStore:
             self.race_store.delete_race()
         assert ctx.value.args[0] == "Not supported for in-memory datastore."
 
+    def test_filter_race_by_name_and_benchmark_name_tag(self):
+        t = track.Track(name="unittest", challenges=[track.Challenge(name="index", default=True)])
+        race = metrics.Race(
+            rally_version="0.4.4",
+            rally_revision="123abc",
+            environment_name="unittest",
+            race_id=self.RACE_ID,
+            race_timestamp=self.RACE_TIMESTAMP,
+            pipeline="from-sources",
+            user_tags={"name": "unittest-test", "benchmark-name": "unittest-test"},
+            track=t,
+            track_params=None,
+            challenge=t.default_challenge,
+            car="4gheap",
+            car_params=None,
+            plugin_params=None,
+        )
+        self.race_store.store_race(race)
+
+        self.cfg.add(config.Scope.application, "system", "list.races.benchmark_name", "unittest-test")
+        assert [r.race_id for r in self.race_store.list()] == [self.RACE_ID]
+
+    @pytest.mark.parametrize("orjson_installed", [True, False])
+    def test_dumps_race_doc(self, orjson_installed, monkeypatch):
+        if not orjson_installed:
+            monkeypatch.setattr(metrics, "orjson", None)
+        doc = {
+            "race-id": self.RACE_ID,
+            "user-tags": {"name": "ünïcödé"},
+            "car-params": None,
+            "plugin-params": {},
+            "results": {"op_metrics": [{"throughput": {"min": 1.5, "max": 2, "unit": "docs/s"}, "errors": [], "valid": True}]},
+        }
+
+        assert metrics.FileRaceStore._dumps(doc) == json.dumps(doc, indent=True, ensure_ascii=False).encode("utf-8")
+
+    def test_dumps_race_doc_with_non_finite_floats(self):
+        doc = {
+            "race-id": self.RACE_ID,
+            "results": {"op_metrics": [{"throughput": {"min": 1.5, "max": float("nan"), "mean": float("inf")}}]},
+        }
+
+        assert metrics.FileRaceStore._dumps(doc) == json.dumps(doc, indent=True, ensure_ascii=False).encode("utf-8")
+
+    def test_dumps_race_doc_with_large_int(self):
+        doc = {"race-id": self.RACE_ID, "results": {"total_size": 2**64}}
+
+        assert json.loads(metrics.FileRaceStore._dumps(doc)) == doc
+
+    def test_list_skips_unreadable_race_files(self):
+        t = track.Track(name="unittest", challenges=[track.Challenge(name="index", default=True)])
+        for race_id, day in [("race-1", 1), ("race-2", 2)]:
+            self.cfg.add(config.Scope.application, "system", "race.id", race_id)
+            race = metrics.Race(
+                rally_version="0.4.4",
+                rally_revision="123abc",
+                environment_name="unittest",
+                race_id=race_id,
+                race_timestamp=datetime.datetime(2016, 2, day),
+                pipeline="from-sources",
+                user_tags={},
+                track=t,
+                track_params=None,
+                challenge=t.default_challenge,
+                car="4gheap",
+                car_params=None,
+                plugin_params=None,
+            )
+            self.race_store.store_race(race)
+        broken_race_file = self.race_store._race_file(race_id="broken")
+        io.ensure_dir(os.path.dirname(broken_race_file))
+        with open(broken_race_file, mode="w", encoding="utf-8") as f:
+            f.write("{")
+
+        assert [r.race_id for r in self.race_store.list()] == ["race-2", "race-1"]
+
 
 class TestStatsCalculator:
     def test_calculate_global_stats(self):
@@ -3526,8 +4283,82 @@ class TestGlobalStatsCalculator:
         result = GlobalStatsCalculator(store=self.metrics_store, track=Track(name="geonames", meta_data={}), challenge=challenge)()
         assert "delete-index" in [op_metric.get("task") for op_metric in result.op_metrics]
 
+    def test_shard_stats(self):
+        self.metrics_store.open(self.RACE_ID, self.RACE_TIMESTAMP, "test", "append-no-conflicts", "defaults", create=True)
+        self.metrics_store.put_doc(doc={"name": "merges_total_time", "unit": "ms", "per-shard": [17, 1289, 18]})
+        self.metrics_store.put_doc(doc={"name": "merges_total_time", "unit": "ms", "per-shard": [273, 222]})
+
+        calculator = GlobalStatsCalculator(store=self.metrics_store, track=None, challenge=None)
+
+        assert calculator.shard_stats("merges_total_time") == {"min": 17, "median": 222, "max": 1289, "unit": "ms"}
+        assert calculator.shard_stats("refresh_total_time") == {}
+
+    def test_transform_and_disk_usage_metrics_require_meta_data(self):
+        calculator = GlobalStatsCalculator(store=self.metrics_store, track=None, challenge=None)
+        transform_docs = [
+            {"name": "total_transform_throughput", "value": 10, "unit": "docs/s", "meta": {"transform_id": "t-1"}},
+            {"name": "total_transform_throughput", "value": 20, "unit": "docs/s"},
+        ]
+        disk_usage_docs = [
+            {"name": "disk_usage_total", "value": 512, "unit": "byte", "meta": {"index": "logs", "field": "message"}},
+            {"name": "disk_usage_total", "value": 1024, "unit": "byte", "meta": {"index": "logs"}},
+            {"name": "disk_usage_total", "value": 2048, "unit": "byte"},
+        ]
+
+        assert calculator._total_transform_metric(transform_docs) == [{"id": "t-1", "mean": 10, "unit": "docs/s"}]
+        assert calculator._disk_usage(disk_usage_docs) == [{"index": "logs", "field": "message", "value": 512, "unit": "byte"}]
+
+
+@pytest.mark.parametrize(
+    "sample_size, expected_percentiles",
+    [
+        (1, (100,)),
+        (9, (50, 100)),
+        (10, (50, 90, 100)),
+        (999, (50, 90, 99, 100)),
+        (1000, (50, 90, 99, 99.9, 100)),
+        (sys.maxsize, (50, 90, 99, 99.9, 99.99, 100)),
+    ],
+)
+def test_percentiles_for_sample_size(sample_size, expected_percentiles):
+    assert metrics.percentiles_for_sample_size(sample_size) == expected_percentiles
+
+
+@pytest.mark.parametrize("key, expected", [(50, "50_0"), (50.0, "50_0"), (99.9, "99_9"), ("99.99", "99_99")])
+def test_encode_float_key(key, expected):
+    assert metrics.encode_float_key(key) == expected
+
+
+def test_percentiles_require_samples():
+    with pytest.raises(AssertionError, match="Percentiles require at least one sample"):
+        metrics.percentiles_for_sample_size(0)
+
 
 class TestGlobalStats:
+    def test_as_dict(self):
+        s = metrics.GlobalStats({"total_time": 300, "young_gc_count": None}, cluster_name="default")
+
+        d = s.as_dict()
+
+        assert d["cluster_name"] == "default"
+        assert d["total_time"] == 300
+        assert d["young_gc_count"] is None
+        assert d["op_metrics"] == []
+        assert d["total_time_per_shard"] == {}
+        assert "_metrics_by_task" not in d
+        # defaults are not shared across instances
+        assert metrics.GlobalStats().op_metrics is not s.op_metrics
+
+    def test_metrics_by_task(self):
+        # race.json files before Rally 0.8.0 only contain the operation name
+        s = metrics.GlobalStats({"op_metrics": [{"operation": "bulk", "error_rate": 0.0}]})
+        assert s.metrics("bulk") == {"operation": "bulk", "error_rate": 0.0}
+        assert s.metrics("search") is None
+
+        s.add_op_metrics("search", "search", None, None, None, None, 0.1, 10, None)
+        assert s.metrics("search")["error_rate"] == 0.1
+        assert s.tasks() == ["bulk", "search"]
+
     def test_as_flat_list(self):
         d = {
             "op_metrics": [
@@ -16,8 +16,11 @@
 # under the License.
 
 import time
+from datetime import datetime
 from unittest import mock
 
+import pytest
+
 import esrally.time
 
 
@@ -54,3 +57,13 @@ class TestTime:
 
         assert end - start == 2000 - 1000
         assert mock_now.call_count == 2
+
+    def test_iso8601_round_trip(self):
+        dt = datetime(2016, 1, 31, 8, 5, 9)
+        assert esrally.time.to_iso8601(dt) == "20160131T080509Z"
+        assert esrally.time.from_iso8601("20160131T080509Z") == dt
+
+    def test_from_iso8601_rejects_invalid_timestamps(self):
+        for ts in ["20161331T080509Z", "2016-01-31T08:05:09Z", "20160131T080509"]:
+            with pytest.raises(ValueError):
+                esrally.time.from_iso8601(ts)
@@ -0,0 +1,87 @@
+# Licensed to Elasticsearch B.V. under one or more contributor
+# license agreements. See the NOTICE file distributed with
+# this work for additional information regarding copyright
+# ownership. Elasticsearch B.V. licenses this file to you under
+# the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# 	http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+from unittest import mock
+
+import pytest
+
+from esrally.tracker import tracker
+from esrally.utils import console
+
+
+@mock.patch("esrally.tracker.corpus.extract")
+@mock.patch("esrally.tracker.index.extract")
+def test_extract_mappings_and_corpora(index_extract, corpus_extract):
+    index_extract.side_effect = lambda client, output_path, index_name: [{"name": index_name}]
+    corpus_extract.side_effect = lambda client, output_path, index_name, batch_size, show_progress: (
+        None if index_name == "empty" else {"index_name": index_name}
+    )
+    client = mock.Mock()
+
+    indices, corpora = tracker.extract_mappings_and_corpora(client, "/tmp/track", ["logs", "empty", "metrics"], 100)
+
+    assert indices == [{"name": "logs"}, {"name": "empty"}, {"name": "metrics"}]
+    # corpora are in the same order as their indices, no matter in which order they have been extracted
+    assert corpora == [{"index_name": "logs"}, {"index_name": "metrics"}]
+    corpus_extract.assert_has_calls(
+        [mock.call(client, "/tmp/track", name, 100, show_progress=False) for name in ["logs", "empty", "metrics"]],
+        any_order=True,
+    )
+
+
+@pytest.fixture
+def interactive_console(monkeypatch):
+    monkeypatch.setattr(console, "QUIET", False)
+    monkeypatch.setattr(console, "ASSUME_TTY", True)
+    monkeypatch.setattr(console, "PLAIN", True)
+
+
+@pytest.mark.parametrize(
+    "index_names, expected_progress, unexpected_progress",
+    [
+        (["logs"], "Extracting documents for index [logs]...", "indices done"),
+        (["logs", "metrics"], "Extracting documents for [2] indices...", "Extracting documents for index"),
+    ],
+)
+@mock.patch("elasticsearch.helpers.scan")
+@mock.patch("esrally.tracker.index.extract")
+def test_extract_corpora_progress(
+    index_extract, scan, index_names, expected_progress, unexpected_progress, tmp_path, capsys, interactive_console
+):
+    index_extract.side_effect = lambda client, output_path, index_name: [{"name": index_name}]
+    scan.side_effect = lambda client, query, index, size: iter([{"_source": {"index": index, "n": n}} for n in range(3)])
+    client = mock.Mock()
+    client.count.return_value = {"count": 3}
+
+    _, corpora = tracker.extract_mappings_and_corpora(client, str(tmp_path), index_names, 100)
+
+    assert [c["index_name"] for c in corpora] == index_names
+    out = capsys.readouterr().out
+    assert expected_progress in out
+    assert unexpected_progress not in out
+
+
+def test_process_template(tmp_path):
+    (tmp_path / "track.json.j2").write_text(
+        '{"name": "{{ track_name }}", "indices": [{% for i in indices %}"{{ i }}"{% if not loop.last %}, {% endif %}{% endfor %}]}\n'
+    )
+    output_path = tmp_path / "track.json"
+
+    tracker.process_template(str(tmp_path), "track.json.j2", {"track_name": "logs", "indices": ["a", "b"]}, str(output_path))
+
+    assert output_path.read_text() == '{"name": "logs", "indices": ["a", "b"]}'
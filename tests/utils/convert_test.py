@@ -178,6 +178,12 @@ def test_duration(case: DurationCase):
     assert convert.ms_to_minutes(got.ms()) == case.want / MINUTE
 
 
+@pytest.mark.parametrize("seconds", [0, 1, -1, 0.001, 1.23456789, 12.345, 1e-10, 86400.5, 1e6, 1761234567.123456])
+def test_seconds_to_ms_matches_duration(seconds):
+    assert convert.seconds_to_ms(seconds) == convert.duration(seconds, convert.Duration.Unit.S).ms()
+    assert convert.seconds_to_ms(convert.duration(seconds)) == convert.duration(seconds).ms()
+
+
 @dataclass()
 class SizeCase:
     value: float | int